@@ -0,0 +1,47 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, QPoint, Qt
+
+DEFAULT_MAX_FPS = 60
+
+def interpolate_point(start, end, progress):
+    return QPoint(
+        round(start.x() + (end.x() - start.x()) * progress),
+        round(start.y() + (end.y() - start.y()) * progress)
+    )
+
+class AnimationClock(QObject):
+    # Drives every bubble animation from one timer. An animation is any
+    # object with a step(now) method returning False once it has finished.
+    # The timer only runs while at least one animation is registered.
+    def __init__(self, max_fps=DEFAULT_MAX_FPS, parent=None):
+        super().__init__(parent)
+        self.animations = []
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.set_max_fps(max_fps)
+
+    def set_max_fps(self, max_fps):
+        self.max_fps = max(1, int(max_fps))
+        self.timer.setInterval(max(1, round(1000 / self.max_fps)))
+
+    def add(self, animation):
+        if animation not in self.animations:
+            self.animations.append(animation)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def remove(self, animation):
+        if animation in self.animations:
+            self.animations.remove(animation)
+        if not self.animations:
+            self.timer.stop()
+
+    def tick(self):
+        now = time.monotonic()
+        finished = [animation for animation in list(self.animations) if not animation.step(now)]
+        for animation in finished:
+            self.remove(animation)
+
+    def is_running(self):
+        return self.timer.isActive()
@@ -7,15 +7,28 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QIcon, QColor
 from PyQt5.QtNetwork import QLocalServer
-from settings_dialog import SettingsDialog
-from word_list_manager import WordListManager
-from custom_input_dialog import CustomInputDialog
-from bubble import Bubble
+import startup_profile
+from animation_clock import AnimationClock
+from layout_engine import LayoutEngine
+from bubble_renderer import set_pixmap_cache_limit, clear_pixmap_cache
+from font_registry import forget_font
+from file_catalog import FileCatalog
+from screen_manager import ScreenManager
+from scheduler import ReviewScheduler, SCHEDULE_EXTENSION
+from weighted_sampler import AliasSampler
+from shuffle_cycle import ShuffleCycle, CYCLE_EXTENSION
+from settings_writer import SettingsWriter
+from dedup_index import DUPLICATE_POLICIES
 from utils import (
-    TRANSLATIONS, load_settings, save_settings, list_word_files, load_words_from_file,
-    set_window_title_bar_theme, ICON_FOLDER
+    TRANSLATIONS, load_settings, list_word_files, get_words, invalidate_word_cache,
+    set_word_cache_limit, set_word_list_format, set_word_storage, set_file_catalog, word_list_sidecar, load_word_weights,
+    load_feedback_weights, save_feedback_weights, set_window_title_bar_theme, ICON_FOLDER
 )
 
+# The bubble windows are created once the main window is up rather than
+# before it is first shown
+BUBBLE_POOL_DELAY_MS = 1000
+
 class WordApp(QWidget):
     VALID_POSITIONS = [
         "random", "top_left", "top_right", "bottom_left", "bottom_right", "center",
@@ -26,14 +39,27 @@ class WordApp(QWidget):
         "cascade_right_to_left_bottom_right", "cascade_left_to_right_bottom_left",
         "top_to_bottom_top_left", "top_to_bottom_top_center", "top_to_bottom_top_right"
     ]
+    VALID_RENDER_MODES = ["windows", "overlay"]
+    VALID_PLAY_MODES = ["sequential", "random", "spaced", "weighted", "shuffle"]
 
     def __init__(self):
         super().__init__()
         self.setWindowFlags(Qt.Window | Qt.WindowMinimizeButtonHint | Qt.WindowCloseButtonHint)
         self.settings = load_settings()
+        startup_profile.mark("settings load")
+        self.settings_writer = SettingsWriter(self.settings, parent=self)
+        QApplication.instance().aboutToQuit.connect(self.settings_writer.close)
         self.language = self.settings.get("language", "fa")
         self.trans = TRANSLATIONS[self.language]
         self.dark_mode = self.settings.get("dark_mode", False)
+        set_word_cache_limit(self.settings.get("word_cache_mb", 64) * 1024 * 1024)
+        set_word_list_format(self.settings.get("word_list_format", "compiled"))
+        set_word_storage(self.settings.get("word_storage", "files"), migrate=True)
+        self.file_catalog = FileCatalog(self)
+        set_file_catalog(self.file_catalog)
+        self.file_catalog.lists_changed.connect(self.word_lists_changed)
+        self.file_catalog.list_modified.connect(self.word_list_modified)
+        self.file_catalog.font_modified.connect(self.font_modified)
 
         self.setWindowTitle(self.trans["window_title"])
         self.resize(600, 200)
@@ -51,10 +77,30 @@ class WordApp(QWidget):
         self.text_alignment = self.settings.get("text_alignment", "right")
         self.selected_font = self.settings.get("selected_font", "Vazir.ttf")
         self.play_mode = self.settings.get("play_mode", "random")
+        if self.play_mode not in self.VALID_PLAY_MODES:
+            self.play_mode = "random"
+        self.scheduler = None
+        self.sampler = None
+        self.sampler_words = None
+        self.shuffle_cycle = None
         self.current_word_index = 0
         self.bubble_position = self.settings.get("bubble_position", "random")
         if self.bubble_position not in self.VALID_POSITIONS:
             self.bubble_position = "random"
+        self.render_mode = self.settings.get("render_mode", "windows")
+        if self.render_mode not in self.VALID_RENDER_MODES:
+            self.render_mode = "windows"
+        self.duplicate_policy = self.settings.get("duplicate_policy", "skip")
+        if self.duplicate_policy not in DUPLICATE_POLICIES:
+            self.duplicate_policy = "skip"
+
+        self.animation_clock = AnimationClock(self.settings.get("max_fps", 60), self)
+        self.layout_engine = LayoutEngine()
+        self.screen_manager = ScreenManager(self.settings.get("bubble_screen", "primary"), self)
+        self.bubble_pool = None
+        QTimer.singleShot(BUBBLE_POOL_DELAY_MS, self.get_bubble_pool)
+        set_pixmap_cache_limit(self.settings.get("pixmap_cache_mb", 32) * 1024 * 1024)
+        self.overlay = None
 
         # Initialize single-instance server
         self.server = QLocalServer(self)
@@ -236,23 +282,144 @@ class WordApp(QWidget):
     def update_selected_list_label(self):
         self.selected_list_label.setText(self.get_display_list_name())
 
+    def word_lists_changed(self):
+        if self.selected_file and self.selected_file not in list_word_files():
+            self.selected_file = ""
+            self.current_word_index = 0
+            self.save_current_settings()
+            self.update_selected_list_label()
+
+    def word_list_modified(self, file_name):
+        # Changed on disk by another program; the sampler and position refer
+        # to the old contents
+        if file_name == self.selected_file:
+            self.sampler = None
+            self.sampler_words = None
+            self.current_word_index = 0
+
+    def font_modified(self, font_file):
+        forget_font(font_file)
+        clear_pixmap_cache()
+
     def show_bubble(self):
         if not self.playing or not self.selected_file:
             return
-        ws = load_words_from_file(self.selected_file)
+        ws = get_words(self.selected_file)
         if ws:
             if self.play_mode == "random":
-                word, meaning = random.choice(ws)
+                index = random.randrange(len(ws))
+            elif self.play_mode == "weighted":
+                index = self.get_sampler(ws).sample()
+            elif self.play_mode == "shuffle":
+                index = self.get_shuffle_cycle().next_index(len(ws))
+            elif self.play_mode == "spaced":
+                scheduler = self.get_scheduler()
+                index = scheduler.next_index(len(ws))
+                # Showing an entry ahead of schedule does not count as a review
+                if scheduler.is_due(index):
+                    scheduler.review(index, 4)
             else:
-                word, meaning = ws[self.current_word_index]
+                if self.current_word_index >= len(ws):
+                    self.current_word_index = 0
+                index = self.current_word_index
                 self.current_word_index = (self.current_word_index + 1) % len(ws)
-            bubble = Bubble(
+            try:
+                word, meaning = ws[index]
+            except ValueError:
+                # The file changed under an indexed list; it is reopened
+                # (and its index rebuilt) on the next tick
+                invalidate_word_cache(self.selected_file)
+                return
+            bubble = self.present_bubble(
                 word, meaning, self.font_size, self.word_color,
                 self.meaning_color, self.bg_color, self.opacity,
                 self.top_most, self.text_alignment, self.selected_font,
                 self.language, self.bubble_duration, self.bubble_position
             )
-            bubble.show()
+            if bubble is not None:
+                bubble.entry = (self.selected_file, index)
+
+    def get_scheduler(self):
+        path = word_list_sidecar(self.selected_file, SCHEDULE_EXTENSION)
+        if self.scheduler is None or self.scheduler.path != path:
+            self.scheduler = ReviewScheduler(path)
+        return self.scheduler
+
+    def entry_deleted(self, file_name, index):
+        # Review records, the shuffle cycle and feedback weights are kept by
+        # row, so later rows move up with the list
+        path = word_list_sidecar(file_name, SCHEDULE_EXTENSION)
+        if self.scheduler is not None and self.scheduler.path == path:
+            self.scheduler.remove_index(index)
+        elif os.path.exists(path):
+            ReviewScheduler(path).remove_index(index)
+        path = word_list_sidecar(file_name, CYCLE_EXTENSION)
+        if self.shuffle_cycle is not None and self.shuffle_cycle.path == path:
+            self.shuffle_cycle.remove_index(index)
+        elif os.path.exists(path):
+            ShuffleCycle(path).remove_index(index)
+        feedback = load_feedback_weights(file_name)
+        if feedback:
+            save_feedback_weights(file_name, {
+                (row - 1 if row > index else row): weight
+                for row, weight in feedback.items() if row != index
+            })
+        if file_name == self.selected_file:
+            self.sampler = None
+            self.sampler_words = None
+
+    def get_shuffle_cycle(self):
+        path = word_list_sidecar(self.selected_file, CYCLE_EXTENSION)
+        if self.shuffle_cycle is None or self.shuffle_cycle.path != path:
+            self.shuffle_cycle = ShuffleCycle(path)
+        return self.shuffle_cycle
+
+    def get_sampler(self, ws):
+        # Rebuilt only when the cached list object changes
+        if self.sampler is None or self.sampler_words is not ws:
+            weights = list(load_word_weights(self.selected_file)[:len(ws)])
+            weights += [1.0] * (len(ws) - len(weights))
+            for index, weight in load_feedback_weights(self.selected_file).items():
+                if index < len(weights):
+                    weights[index] = weight
+            self.sampler = AliasSampler(weights)
+            self.sampler_words = ws
+        return self.sampler
+
+    def bubble_clicked(self, bubble):
+        # Clicking a bubble marks its entry as not yet learned
+        if bubble.entry is None:
+            return
+        file_name, index = bubble.entry
+        if file_name != self.selected_file:
+            return
+        if self.play_mode == "spaced":
+            self.get_scheduler().review(index, 1)
+        elif self.play_mode == "weighted" and self.sampler is not None and index < len(self.sampler):
+            weight = min(self.sampler.weight(index) * 2, 64.0)
+            self.sampler.update(index, weight)
+            feedback = load_feedback_weights(file_name)
+            feedback[index] = weight
+            save_feedback_weights(file_name, feedback)
+
+    def get_bubble_pool(self):
+        if self.bubble_pool is None:
+            from bubble import BubblePool
+            self.bubble_pool = BubblePool(
+                self.animation_clock, self.layout_engine, self.screen_manager,
+                self.settings.get("bubble_pool_size", 4)
+            )
+            self.bubble_pool.on_click = self.bubble_clicked
+        return self.bubble_pool
+
+    def present_bubble(self, *content):
+        if self.render_mode == "overlay":
+            if self.overlay is None:
+                from overlay import OverlayCompositor
+                self.overlay = OverlayCompositor(self.animation_clock, self.layout_engine, self.screen_manager)
+            self.overlay.show_bubble(*content)
+            return None
+        return self.get_bubble_pool().show_bubble(*content)
 
     def toggle_play(self):
         self.playing = not self.playing
@@ -267,7 +434,8 @@ class WordApp(QWidget):
 
     def select_play_mode(self):
         items = self.trans["play_mode_options"]
-        current = items[0] if self.play_mode == "sequential" else items[1]
+        current = items[self.VALID_PLAY_MODES.index(self.play_mode)]
+        from custom_input_dialog import CustomInputDialog
         dialog = CustomInputDialog(
             self, self.trans["play_mode_title"],
             self.trans["play_mode_prompt"],
@@ -275,21 +443,27 @@ class WordApp(QWidget):
         )
         if dialog.exec_():
             mode = dialog.get_selected_item()
-            self.play_mode = "sequential" if mode == items[0] else "random"
+            self.play_mode = self.VALID_PLAY_MODES[items.index(mode)]
             self.current_word_index = 0
             self.save_current_settings()
 
     def open_settings(self):
+        from settings_dialog import SettingsDialog
         dlg = SettingsDialog(self)
         if dlg.exec_():
             self.language = dlg.language
             self.trans = TRANSLATIONS[self.language]
             self.bubble_position = dlg.bubble_position
+            if self.overlay is not None and self.render_mode != "overlay":
+                self.overlay.clear()
             self.update_ui_texts()
             self.save_current_settings()
 
     def open_manage(self):
+        from word_list_manager import WordListManager
         dlg = WordListManager(self)
+        # Frees its search and duplicate indexes once closed
+        dlg.setAttribute(Qt.WA_DeleteOnClose)
         dlg.exec_()
 
     def select_list(self):
@@ -298,6 +472,7 @@ class WordApp(QWidget):
             QMessageBox.information(self, "Info" if self.language == "en" else "اطلاعات",
                                    self.trans["no_lists_found"])
             return
+        from custom_input_dialog import CustomInputDialog
         dialog = CustomInputDialog(
             self, self.trans["select_list_title"],
             self.trans["select_list_prompt"],
@@ -351,9 +526,12 @@ class WordApp(QWidget):
             "language": self.language,
             "play_mode": self.play_mode,
             "bubble_position": self.bubble_position,
+            "render_mode": self.render_mode,
+            "bubble_screen": self.screen_manager.target,
+            "duplicate_policy": self.duplicate_policy,
             "dark_mode": self.dark_mode
         })
-        save_settings(self.settings)
+        self.settings_writer.mark_dirty(self.settings)
 
     def handle_new_connection(self):
         socket = self.server.nextPendingConnection()
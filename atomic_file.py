@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# Crash-safe replacement of a file: the new content is written to a temp
+# file in the same folder, flushed to disk, then renamed over the target, so
+# readers see either the old file or the new one and never a truncated one.
+BACKUP_SUFFIX = ".bak"
+
+# mkstemp creates files as 0600; the replacement gets the target's mode, or
+# what a plain open() would have given a new file. The umask can only be read
+# by setting it, so that happens once here rather than in writer threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def backup_path(path):
+    return path + BACKUP_SUFFIX
+
+@contextmanager
+def atomic_write(path, binary=False, backup=False):
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        if binary:
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding="utf-8")
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        _copy_mode(path, tmp_path)
+        if backup and os.path.exists(path):
+            _keep_backup(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _sync_folder(folder)
+
+def _copy_mode(path, tmp_path):
+    try:
+        shutil.copymode(path, tmp_path)
+    except OSError:
+        try:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        except OSError:
+            pass
+
+def _keep_backup(path):
+    # The previous version becomes the backup; a hard link keeps the target in
+    # place the whole time, copying is the fallback where links are missing.
+    bak_path = backup_path(path)
+    try:
+        if os.path.exists(bak_path):
+            os.remove(bak_path)
+        os.link(path, bak_path)
+    except OSError:
+        try:
+            shutil.copy2(path, bak_path)
+        except OSError:
+            pass
+
+def _sync_folder(folder):
+    # Makes the rename itself durable; not possible (or needed) on Windows
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from PyQt5.QtWidgets import QLabel, QWidget
+from PyQt5.QtCore import Qt, QPoint
+from PyQt5.QtGui import QPixmap, QRegion
+from font_registry import get_font
+from utils import is_rtl
+
+PIXMAP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+ALIGNMENT_MAP = {
+    "right": Qt.AlignRight | Qt.AlignVCenter,
+    "left": Qt.AlignLeft | Qt.AlignVCenter,
+    "center": Qt.AlignCenter | Qt.AlignVCenter
+}
+
+# Rendered bubble contents keyed by entry, style and device pixel ratio, in
+# least-recently-used order.
+_pixmap_cache = OrderedDict()
+_pixmap_cache_bytes = 0
+_label = None
+_label_style_sheet = None
+hits = 0
+misses = 0
+
+def _pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+def set_pixmap_cache_limit(max_bytes):
+    global PIXMAP_CACHE_MAX_BYTES
+    PIXMAP_CACHE_MAX_BYTES = max(0, int(max_bytes))
+    _evict()
+
+def clear_pixmap_cache():
+    global _pixmap_cache_bytes
+    _pixmap_cache.clear()
+    _pixmap_cache_bytes = 0
+
+def _evict():
+    global _pixmap_cache_bytes
+    while _pixmap_cache_bytes > PIXMAP_CACHE_MAX_BYTES and _pixmap_cache:
+        _, pixmap = _pixmap_cache.popitem(last=False)
+        _pixmap_cache_bytes -= _pixmap_bytes(pixmap)
+
+def _render(word, meaning, font_size, word_color, meaning_color, bg_color, alignment, font_file, language, dpr):
+    global _label, _label_style_sheet
+    if _label is None:
+        _label = QLabel()
+    text = f'<span style="color:{word_color}; font-weight: bold;">{word}</span><br><span style="color:{meaning_color};">({meaning})</span>'
+    _label.setText(text)
+    style_sheet = f"""
+        QLabel {{
+            background-color: {bg_color};
+            border-radius: 15px;
+            padding: 12px;
+            border: 1px solid #AAAAAA;
+        }}
+    """
+    if style_sheet != _label_style_sheet:
+        _label.setStyleSheet(style_sheet)
+        _label_style_sheet = style_sheet
+    _label.setFont(get_font(font_file, font_size))
+    _label.setAlignment(ALIGNMENT_MAP.get(alignment, Qt.AlignRight | Qt.AlignVCenter))
+    _label.setLayoutDirection(Qt.RightToLeft if alignment == "right" or (language == "fa" and is_rtl(text)) else Qt.LeftToRight)
+    _label.ensurePolished()
+    size = _label.sizeHint()
+    _label.resize(size)
+    pixmap = QPixmap(size * dpr)
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.transparent)
+    _label.render(pixmap, QPoint(), QRegion(), QWidget.DrawChildren)
+    return pixmap
+
+def render_bubble(word, meaning, font_size, word_color, meaning_color, bg_color, alignment, font_file, language, dpr=1.0):
+    global _pixmap_cache_bytes, hits, misses
+    key = (
+        word, meaning, font_file, font_size, word_color.name(), meaning_color.name(),
+        bg_color.name(), alignment, language, dpr
+    )
+    pixmap = _pixmap_cache.get(key)
+    if pixmap is not None:
+        hits += 1
+        _pixmap_cache.move_to_end(key)
+        return pixmap
+    misses += 1
+    pixmap = _render(word, meaning, font_size, key[4], key[5], key[6], alignment, font_file, language, dpr)
+    _pixmap_cache[key] = pixmap
+    _pixmap_cache_bytes += _pixmap_bytes(pixmap)
+    _evict()
+    return pixmap
+
+def pixmap_cache_stats():
+    return {
+        "entries": len(_pixmap_cache),
+        "bytes": _pixmap_cache_bytes,
+        "hits": hits,
+        "misses": misses
+    }
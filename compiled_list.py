@@ -0,0 +1,170 @@
+import os
+import sys
+import mmap
+import struct
+from array import array
+from collections.abc import Sequence
+from word_format import parse_word_line
+from indexed_list import prefix_digest
+from atomic_file import atomic_write
+
+# Layout of a compiled word list (.wbx):
+#   header   magic, version, entry count, source mtime_ns, source size,
+#            digest of the source bytes
+#   offsets  2 * count + 1 little-endian uint64, relative to the blob start;
+#            entry i is word = blob[o[2i]:o[2i+1]], meaning = blob[o[2i+1]:o[2i+2]]
+#   blob     UTF-8 text of every word and meaning, back to back
+# A source that only grew past the compiled bytes (the app appends new words)
+# is served as the compiled list plus the parsed new lines; it is recompiled
+# once more than TAIL_LIMIT entries have piled up that way.
+MAGIC = b"WBX1"
+VERSION = 2
+HEADER = struct.Struct("<4sIQqQ16s")
+COMPILED_EXTENSION = ".wbx"
+TAIL_LIMIT = 4096
+
+def compiled_path_for(file_path):
+    return os.path.splitext(file_path)[0] + COMPILED_EXTENSION
+
+def compile_word_list(words, dest_path, source_signature, source_digest):
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for word, meaning in words:
+        blob += word.encode("utf-8")
+        offsets.append(len(blob))
+        blob += meaning.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    mtime_ns, size = source_signature
+    with atomic_write(dest_path, binary=True) as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(words), mtime_ns, size, source_digest))
+        f.write(offsets.tobytes())
+        f.write(blob)
+
+class CompiledWordList(Sequence):
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, mtime_ns, size, source_digest = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a compiled word list: {path}")
+            table_end = HEADER.size + (2 * count + 1) * 8
+            if len(self._mm) < table_end:
+                raise ValueError(f"truncated compiled word list: {path}")
+        except Exception:
+            self._mm.close()
+            raise
+        self.source_signature = (mtime_ns, size)
+        self.source_digest = source_digest
+        self._count = count
+        self._blob_start = table_end
+        self._view = memoryview(self._mm)[HEADER.size:table_end]
+        self._offsets = self._view.cast("Q") if sys.byteorder == "little" else None
+
+    def _offset(self, i):
+        if self._offsets is not None:
+            return self._offsets[i]
+        return struct.unpack_from("<Q", self._mm, HEADER.size + i * 8)[0]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("word list index out of range")
+        base = self._blob_start
+        start = self._offset(2 * index)
+        middle = self._offset(2 * index + 1)
+        end = self._offset(2 * index + 2)
+        word = self._mm[base + start:base + middle].decode("utf-8")
+        meaning = self._mm[base + middle:base + end].decode("utf-8")
+        return word, meaning
+
+    def resident_size(self):
+        return sys.getsizeof(self) + 256
+
+    def close(self):
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        self._view.release()
+        self._mm.close()
+
+class AppendedWordList(Sequence):
+    def __init__(self, base, tail):
+        self.base = base
+        self.tail = tail
+
+    def __len__(self):
+        return len(self.base) + len(self.tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < len(self.base):
+            return self.base[index]
+        if not 0 <= index - len(self.base) < len(self.tail):
+            raise IndexError("word list index out of range")
+        return self.tail[index - len(self.base)]
+
+    def resident_size(self):
+        size = self.base.resident_size() + sys.getsizeof(self.tail)
+        for word, meaning in self.tail:
+            size += 56 + sys.getsizeof(word) + sys.getsizeof(meaning)
+        return size
+
+    def close(self):
+        self.base.close()
+
+def _appended_entries(file_path, words, source_size):
+    # Entries added after the compiled bytes, or None when anything before
+    # them changed (or the old last line was continued instead of ended)
+    start = words.source_signature[1]
+    if source_size <= start:
+        return None
+    with open(file_path, "rb") as f:
+        if prefix_digest(f, start) != words.source_digest:
+            return None
+        if start > 0:
+            f.seek(start - 1)
+            if b"\n" not in f.read(2):
+                return None
+        f.seek(start)
+        tail = f.read(source_size - start)
+    entries = []
+    for line in tail.decode("utf-8", errors="replace").splitlines():
+        entry = parse_word_line(line)
+        if entry:
+            entries.append(entry)
+            if len(entries) > TAIL_LIMIT:
+                return None
+    return entries
+
+def open_compiled_word_list(file_path, source_signature, load_words):
+    # Returns a CompiledWordList for file_path, rebuilding the .wbx companion
+    # when it is missing or was compiled from a different version of the text.
+    compiled = compiled_path_for(file_path)
+    if os.path.exists(compiled):
+        try:
+            words = CompiledWordList(compiled)
+            if words.source_signature == source_signature:
+                return words
+            tail = _appended_entries(file_path, words, source_signature[1])
+            if tail is not None:
+                return AppendedWordList(words, tail)
+            words.close()
+        except (OSError, ValueError):
+            pass
+    entries = load_words()
+    with open(file_path, "rb") as f:
+        source_digest = prefix_digest(f, source_signature[1])
+    compile_word_list(entries, compiled, source_signature, source_digest)
+    return CompiledWordList(compiled)
@@ -0,0 +1,121 @@
+import hashlib
+from bisect import bisect_left, insort
+from search_index import normalize
+
+# Finds entries with the same word in O(1). Words are compared after the
+# same Persian/Arabic folding the search box uses plus whitespace collapsing,
+# and only a 64-bit hash of that key is kept, mapped to the first entry with
+# it; later entries with the same key (a list may already hold duplicates)
+# are kept apart so they are found once the first is gone. Entries are
+# numbered once, when indexed (appends get the next number); a delete only
+# records the removed number, and rows are worked out from those numbers in
+# O(log d) when looked up, so nothing else moves. A list is indexed
+# CHUNK_SIZE entries per build_chunk() call so the GUI can spread the work.
+DUPLICATE_POLICIES = ["skip", "replace", "concatenate"]
+MEANING_SEPARATOR = " / "
+
+CHUNK_SIZE = 512
+
+def _key(normalized):
+    key = " ".join(normalized.split())
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def word_key(word):
+    return _key(normalize(word))
+
+def merge_meanings(old_meaning, new_meaning, policy):
+    if policy == "replace":
+        return new_meaning
+    if policy == "concatenate":
+        if new_meaning in old_meaning.split(MEANING_SEPARATOR):
+            return old_meaning
+        return old_meaning + MEANING_SEPARATOR + new_meaning
+    return old_meaning
+
+class DedupIndex:
+    def __init__(self, words=()):
+        # key -> first entry number; key -> the other entry numbers, sorted,
+        # for keys held by more than one entry; deleted entry numbers, sorted
+        self.ids = {}
+        self.more_ids = {}
+        self.deleted = []
+        self.next_id = 0
+        self.words = words if len(words) else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def is_complete(self):
+        return self.words is None
+
+    def build_chunk(self):
+        start = self.next_id
+        entries = self.words[start:start + CHUNK_SIZE]
+        # Words never contain a newline, so a chunk is normalized in one go
+        for offset, word in enumerate(normalize("\n".join(entry[0] for entry in entries)).split("\n")):
+            self._insert(_key(word), start + offset)
+        self.next_id = start + len(entries)
+        if not entries or self.next_id >= len(self.words):
+            self.words = None
+
+    def build(self):
+        while not self.is_complete():
+            self.build_chunk()
+
+    def _insert(self, key, entry_id):
+        first = self.ids.setdefault(key, entry_id)
+        if first == entry_id:
+            return
+        if entry_id < first:
+            self.ids[key] = entry_id
+            entry_id = first
+        insort(self.more_ids.setdefault(key, []), entry_id)
+
+    def _delete(self, key, entry_id):
+        more = self.more_ids.get(key)
+        if self.ids.get(key) == entry_id:
+            if more:
+                self.ids[key] = more.pop(0)
+            else:
+                del self.ids[key]
+        elif more:
+            position = bisect_left(more, entry_id)
+            if position < len(more) and more[position] == entry_id:
+                del more[position]
+        if more is not None and not more:
+            del self.more_ids[key]
+
+    def _row(self, entry_id):
+        return entry_id - bisect_left(self.deleted, entry_id)
+
+    def _id(self, row):
+        # The smallest k with deleted[k] - k > row: that many deleted numbers
+        # come before the row's own
+        deleted = self.deleted
+        low, high = 0, len(deleted)
+        while low < high:
+            middle = (low + high) // 2
+            if deleted[middle] - middle > row:
+                high = middle
+            else:
+                low = middle + 1
+        return row + low
+
+    def find(self, word):
+        entry_id = self.ids.get(word_key(word))
+        return None if entry_id is None else self._row(entry_id)
+
+    def add(self, word):
+        # For an entry appended at the end of the list
+        self._insert(word_key(word), self.next_id)
+        self.next_id += 1
+
+    def update(self, old_word, new_word, row):
+        entry_id = self._id(row)
+        self._delete(word_key(old_word), entry_id)
+        self._insert(word_key(new_word), entry_id)
+
+    def remove(self, word, row):
+        entry_id = self._id(row)
+        self._delete(word_key(word), entry_id)
+        insort(self.deleted, entry_id)
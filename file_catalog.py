@@ -0,0 +1,110 @@
+import os
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from utils import (
+    DATA_FOLDER, FONTS_FOLDER, scan_word_files, scan_font_files,
+    invalidate_word_cache
+)
+
+# In-memory listing of the word lists and fonts, kept current with a
+# QFileSystemWatcher on both folders and on every list file. Notifications
+# are coalesced for CHANGE_DELAY_MS since editors and atomic saves usually
+# produce several in a row. Only the list that changed loses its cached
+# words; changes the app made itself (reported through list_written) are
+# ignored.
+CHANGE_DELAY_MS = 150
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class FileCatalog(QObject):
+    lists_changed = pyqtSignal()
+    fonts_changed = pyqtSignal()
+    # a list file was changed by something other than this app
+    list_modified = pyqtSignal(str)
+    # a font file was replaced or removed
+    font_modified = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.path_changed)
+        self.watcher.fileChanged.connect(self.path_changed)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(CHANGE_DELAY_MS)
+        self.timer.timeout.connect(self.apply_changes)
+        self.pending = set()
+        self.lists = sorted(scan_word_files())
+        self.signatures = {name: _signature(os.path.join(DATA_FOLDER, name)) for name in self.lists}
+        self.fonts = {name: _signature(os.path.join(FONTS_FOLDER, name)) for name in scan_font_files()}
+        self.watcher.addPaths([DATA_FOLDER, FONTS_FOLDER])
+        self._watch_lists()
+
+    def word_files(self):
+        return list(self.lists)
+
+    def font_files(self):
+        return sorted(self.fonts)
+
+    def is_watching(self, file_name):
+        # Until a pending notification is handled the cache cannot be trusted
+        return file_name in self.lists and not self.pending and not self.timer.isActive()
+
+    def list_written(self, file_name):
+        # May be called from an import worker thread; a single dict store
+        self.signatures[file_name] = _signature(os.path.join(DATA_FOLDER, file_name))
+
+    def _watch_lists(self):
+        # Atomic saves replace the file, which drops its watch; re-add those
+        watched = set(self.watcher.files())
+        paths = [os.path.join(DATA_FOLDER, name) for name in self.lists]
+        missing = [path for path in paths if path not in watched and os.path.exists(path)]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def path_changed(self, path):
+        self.pending.add(path)
+        self.timer.start()
+
+    def apply_changes(self):
+        pending, self.pending = self.pending, set()
+        folders = {os.path.normpath(path) for path in pending}
+        if os.path.normpath(FONTS_FOLDER) in folders:
+            self._rescan_fonts()
+        names = {os.path.basename(path) for path in pending if path.endswith(".txt")}
+        if os.path.normpath(DATA_FOLDER) in folders:
+            lists = sorted(scan_word_files())
+            if lists != self.lists:
+                self.lists = lists
+                self.lists_changed.emit()
+            # A rename over a list shows up only as a folder change
+            names |= set(lists)
+        self._watch_lists()
+        for name in sorted(names):
+            signature = _signature(os.path.join(DATA_FOLDER, name))
+            previous = self.signatures.get(name)
+            if signature == previous:
+                continue
+            if signature is None:
+                self.signatures.pop(name)
+                invalidate_word_cache(name)
+                continue
+            self.signatures[name] = signature
+            # New lists are announced by lists_changed
+            if previous is not None:
+                invalidate_word_cache(name)
+                self.list_modified.emit(name)
+
+    def _rescan_fonts(self):
+        fonts = {name: _signature(os.path.join(FONTS_FOLDER, name)) for name in scan_font_files()}
+        if fonts == self.fonts:
+            return
+        for name, signature in self.fonts.items():
+            if fonts.get(name) != signature:
+                self.font_modified.emit(name)
+        self.fonts = fonts
+        self.fonts_changed.emit()
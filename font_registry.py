@@ -0,0 +1,38 @@
+import os
+from PyQt5.QtGui import QFont, QFontDatabase
+from utils import FONTS_FOLDER
+
+DEFAULT_FAMILY = "Arial"
+
+# font file -> (application font id, family name); each file in FONTS_FOLDER
+# is handed to QFontDatabase at most once per process.
+_registered = {}
+_fonts = {}
+
+def font_family(font_file):
+    if font_file in _registered:
+        return _registered[font_file][1]
+    font_path = os.path.join(FONTS_FOLDER, font_file)
+    if not font_file or not os.path.exists(font_path):
+        return DEFAULT_FAMILY
+    font_id = QFontDatabase.addApplicationFont(font_path)
+    font_families = QFontDatabase.applicationFontFamilies(font_id) if font_id != -1 else []
+    family = font_families[0] if font_families else DEFAULT_FAMILY
+    _registered[font_file] = (font_id, family)
+    return family
+
+def get_font(font_file, size):
+    key = (font_file, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = QFont(font_family(font_file), size)
+        _fonts[key] = font
+    return QFont(font)
+
+def forget_font(font_file):
+    # Drops a registration so a replaced font file is loaded again
+    font_id, _ = _registered.pop(font_file, (-1, None))
+    if font_id != -1:
+        QFontDatabase.removeApplicationFont(font_id)
+    for key in [key for key in _fonts if key[0] == font_file]:
+        del _fonts[key]
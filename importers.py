@@ -0,0 +1,241 @@
+import os
+import io
+import re
+import csv
+import json
+import html
+import shutil
+import sqlite3
+import zipfile
+import tempfile
+from word_format import parse_weighted_line, make_entry
+import utils
+from utils import word_list_writer
+from dedup_index import DedupIndex, merge_meanings
+
+# Readers for the formats a list can be imported from. A reader takes a
+# binary file object and yields one (word, meaning, weight) entry per
+# record, or None for a record it could not use; it never holds the whole
+# file in memory. New formats are added with register_importer.
+IMPORTERS = {}
+PROGRESS_EVERY = 4096
+IMPORT_ERRORS = (OSError, ValueError, csv.Error, sqlite3.Error, zipfile.BadZipFile)
+
+class ImportCancelled(Exception):
+    pass
+
+class EmptyImport(Exception):
+    pass
+
+def register_importer(extensions, reader):
+    for extension in extensions:
+        IMPORTERS[extension.lower()] = reader
+
+def importer_for(path):
+    return IMPORTERS.get(os.path.splitext(path)[1].lower())
+
+def supported_extensions():
+    return sorted(IMPORTERS)
+
+def read_text(f):
+    for raw in f:
+        try:
+            line = raw.decode("utf-8").lstrip("\ufeff")
+        except UnicodeDecodeError:
+            yield None
+            continue
+        if line.strip():
+            yield parse_weighted_line(line)
+
+def _read_delimited(delimiter):
+    def read(f):
+        text = io.TextIOWrapper(f, encoding="utf-8-sig", errors="replace", newline="")
+        for row in csv.reader(text, delimiter=delimiter):
+            if not any(field.strip() for field in row):
+                continue
+            if len(row) < 2:
+                yield None
+            elif row[0].strip().lower() == "word" and row[1].strip().lower() == "meaning":
+                continue
+            else:
+                yield make_entry(*row[:3])
+        text.detach()
+    return read
+
+def read_json(f):
+    # A top-level array of {"word", "meaning", "weight"} objects or of
+    # [word, meaning, weight] arrays, decoded one element at a time
+    decoder = json.JSONDecoder()
+    text = io.TextIOWrapper(f, encoding="utf-8-sig", errors="replace")
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != "[":
+                raise ValueError("expected a JSON array")
+            started = True
+            position += 1
+            continue
+        if started and position < len(buffer) and buffer[position] == "]":
+            break
+        try:
+            if position >= len(buffer):
+                raise ValueError("need more data")
+            item, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            if eof:
+                if position < len(buffer):
+                    raise ValueError("truncated JSON array")
+                break
+            chunk = text.read(64 * 1024)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        position = end
+        if isinstance(item, dict):
+            yield make_entry(item.get("word", ""), item.get("meaning", ""), item.get("weight", 1.0))
+        elif isinstance(item, list) and len(item) >= 2:
+            yield make_entry(*item[:3])
+        else:
+            yield None
+    text.detach()
+
+_TAGS = re.compile(r"<[^>]+>")
+
+def _field_text(field):
+    return html.unescape(_TAGS.sub(" ", field.replace("<br>", " ")))
+
+def read_anki(f):
+    # .apkg/.colpkg files are zip archives holding the collection as SQLite;
+    # only the first two fields of each note are used. Newer zstd-compressed
+    # collections (collection.anki21b) are not readable with the stdlib, and
+    # the collection.anki2 packed next to one only holds a note asking to
+    # update Anki.
+    with zipfile.ZipFile(f) as archive:
+        names = set(archive.namelist())
+        if "collection.anki21b" in names:
+            raise ValueError("zstd Anki collection not supported")
+        member = next((name for name in ("collection.anki21", "collection.anki2") if name in names), None)
+        if member is None:
+            raise ValueError("no readable Anki collection in package")
+        fd, db_path = tempfile.mkstemp(suffix=".anki2")
+        try:
+            with os.fdopen(fd, "wb") as db_file, archive.open(member) as src:
+                shutil.copyfileobj(src, db_file)
+            connection = sqlite3.connect(db_path)
+            try:
+                for (fields,) in connection.execute("SELECT flds FROM notes ORDER BY id"):
+                    parts = fields.split("\x1f")
+                    if len(parts) < 2:
+                        yield None
+                    else:
+                        yield make_entry(_field_text(parts[0]), _field_text(parts[1]))
+            finally:
+                connection.close()
+        finally:
+            os.remove(db_path)
+
+register_importer([".txt"], read_text)
+register_importer([".csv"], _read_delimited(","))
+register_importer([".tsv", ".tab"], _read_delimited("\t"))
+register_importer([".json"], read_json)
+register_importer([".apkg", ".colpkg"], read_anki)
+
+class EntrySink:
+    # Where every importer's entries end up: counts rejected records and
+    # merges entries whose word was already imported. "skip" can stream
+    # straight to the list; the other policies may change an entry after it
+    # was seen, so entries are held until finish().
+    def __init__(self, dest, policy="skip"):
+        self.dest = dest
+        self.policy = policy
+        self.index = DedupIndex()
+        self.entries = [] if policy != "skip" else None
+        self.count = 0
+        self.rejected = 0
+        self.duplicates = 0
+
+    def add(self, entry):
+        if entry is None:
+            self.rejected += 1
+            return
+        row = self.index.find(entry[0])
+        if row is not None:
+            self.duplicates += 1
+            if self.entries is not None:
+                word, meaning, weight = self.entries[row]
+                self.entries[row] = (word, merge_meanings(meaning, entry[1], self.policy), weight)
+            return
+        self.index.add(entry[0])
+        if self.entries is not None:
+            self.entries.append(entry)
+        else:
+            self.dest.add(*entry)
+        self.count += 1
+
+    def finish(self):
+        if self.entries is not None:
+            for entry in self.entries:
+                self.dest.add(*entry)
+            self.entries = []
+
+def import_into_list(source_path, file_name, on_progress=None, is_cancelled=None, policy="skip"):
+    # Returns (imported, rejected). The list is replaced atomically only when
+    # the whole source was read; on_progress gets the fraction read so far.
+    # policy says what happens to entries whose word was already imported.
+    reader = importer_for(source_path)
+    if reader is None:
+        raise ValueError(f"unsupported file type: {source_path}")
+    total = max(1, os.path.getsize(source_path))
+    with open(source_path, "rb") as src, word_list_writer(file_name) as dest:
+        sink = EntrySink(dest, policy)
+        for number, entry in enumerate(reader(src), 1):
+            sink.add(entry)
+            if number % PROGRESS_EVERY == 0:
+                if is_cancelled is not None and is_cancelled():
+                    raise ImportCancelled()
+                if on_progress is not None:
+                    on_progress(min(1.0, src.tell() / total), sink.rejected)
+        if not sink.count:
+            raise EmptyImport()
+        sink.finish()
+    return sink.count, sink.rejected
+
+def import_file_job(source_path, file_name, policy="skip", storage="files"):
+    # Process-pool entry point; exceptions are returned, not raised, so one
+    # bad file does not stop the others
+    try:
+        if utils.WORD_STORAGE != storage:
+            utils.set_word_storage(storage)
+        count, rejected = import_into_list(source_path, file_name, policy=policy)
+    except EmptyImport:
+        return file_name, 0, 0, "empty"
+    except IMPORT_ERRORS as e:
+        return file_name, 0, 0, str(e) or type(e).__name__
+    return file_name, count, rejected, None
+
+def folder_import_files(folder):
+    # (source path, list file name) for every importable file in folder. Each
+    # list name is used once: words.csv next to words.json gives words.txt
+    # and words_json.txt, as both are imported at the same time.
+    jobs = []
+    used = set()
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path) and importer_for(path) is not None:
+            stem, ext = os.path.splitext(name)
+            file_name = stem + ".txt"
+            if file_name.lower() in used:
+                file_name = f"{stem}_{ext[1:]}.txt"
+                number = 2
+                while file_name.lower() in used:
+                    file_name = f"{stem}_{ext[1:]}_{number}.txt"
+                    number += 1
+            used.add(file_name.lower())
+            jobs.append((path, file_name))
+    return jobs
@@ -0,0 +1,194 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+from array import array
+from collections.abc import Sequence
+from word_format import parse_word_line
+from atomic_file import atomic_write
+
+# Sidecar index (.idx) for a plain-text word list:
+#   header   magic, version, source mtime_ns, source size, scanned_to,
+#            digest of the bytes before scanned_to, entry count
+#   offsets  count little-endian uint64 byte offsets of valid lines
+# Only newline-terminated lines before scanned_to are indexed on disk, so a
+# list that grew by appending is extended from scanned_to instead of rebuilt.
+# Hashing the prefix is a plain read, much cheaper than parsing every line.
+MAGIC = b"WBI1"
+VERSION = 2
+HEADER = struct.Struct("<4sIqQQ16sQ")
+INDEX_EXTENSION = ".idx"
+DIGEST_CHUNK = 1024 * 1024
+SCAN_CHUNK = 4096
+# Entries read back when a list is opened, as a last check that the index
+# still matches the file
+SPOT_CHECKS = 16
+
+class StaleIndexError(ValueError):
+    pass
+
+def index_path_for(file_path):
+    return os.path.splitext(file_path)[0] + INDEX_EXTENSION
+
+def prefix_digest(f, position):
+    # blake2b of the first `position` bytes of an open binary file
+    digest = hashlib.blake2b(digest_size=16)
+    f.seek(0)
+    remaining = position
+    while remaining > 0:
+        data = f.read(min(DIGEST_CHUNK, remaining))
+        if not data:
+            break
+        digest.update(data)
+        remaining -= len(data)
+    return digest.digest()
+
+def _scan_lines(f, start):
+    # Yields offsets of valid, newline-terminated lines from start and returns
+    # the position just past the last complete line.
+    f.seek(start)
+    position = start
+    offsets = array("Q")
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        if parse_word_line(line.decode("utf-8", errors="replace")):
+            offsets.append(position)
+        position += len(line)
+        if len(offsets) >= SCAN_CHUNK:
+            yield offsets
+            offsets = array("Q")
+    if offsets:
+        yield offsets
+    return position
+
+def _write_offsets(idx, scan):
+    count = 0
+    while True:
+        try:
+            offsets = next(scan)
+        except StopIteration as done:
+            return count, done.value
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        idx.write(offsets.tobytes())
+        count += len(offsets)
+
+def build_index(file_path, signature):
+    with open(file_path, "rb") as src, atomic_write(index_path_for(file_path), binary=True) as idx:
+        idx.write(b"\0" * HEADER.size)
+        count, scanned_to = _write_offsets(idx, _scan_lines(src, 0))
+        digest = prefix_digest(src, scanned_to)
+        idx.seek(0)
+        idx.write(HEADER.pack(MAGIC, VERSION, signature[0], signature[1], scanned_to, digest, count))
+
+def _read_header(idx_path):
+    with open(idx_path, "rb") as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError(f"truncated index: {idx_path}")
+    magic, version, mtime_ns, size, scanned_to, digest, count = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a word list index: {idx_path}")
+    return (mtime_ns, size), scanned_to, digest, count
+
+def update_index(file_path, signature):
+    # Brings the sidecar index up to date with the text file, appending offsets
+    # for new lines when the already indexed prefix is unchanged.
+    idx_path = index_path_for(file_path)
+    try:
+        indexed_signature, scanned_to, digest, count = _read_header(idx_path)
+    except (OSError, ValueError):
+        build_index(file_path, signature)
+        return
+    if indexed_signature == signature:
+        return
+    with open(file_path, "rb") as src:
+        # Only a file that grew can be an append; any other change rebuilds
+        if signature[1] <= indexed_signature[1] or prefix_digest(src, scanned_to) != digest:
+            extendable = False
+        else:
+            extendable = True
+            with open(idx_path, "r+b") as idx:
+                idx.seek(HEADER.size + count * 8)
+                added, scanned_to = _write_offsets(idx, _scan_lines(src, scanned_to))
+                digest = prefix_digest(src, scanned_to)
+                idx.seek(0)
+                idx.write(HEADER.pack(MAGIC, VERSION, signature[0], signature[1], scanned_to, digest, count + added))
+    if not extendable:
+        build_index(file_path, signature)
+
+class IndexedWordList(Sequence):
+    def __init__(self, file_path, idx_path):
+        self.file_path = file_path
+        self.source_signature, scanned_to, _, count = _read_header(idx_path)
+        self._count = count
+        with open(idx_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size + count * 8:
+            self._mm.close()
+            raise ValueError(f"truncated index: {idx_path}")
+        self._view = memoryview(self._mm)[HEADER.size:HEADER.size + count * 8]
+        self._offsets = self._view.cast("Q") if sys.byteorder == "little" else None
+        # An unterminated last line is not part of the on-disk index
+        self._tail = None
+        with open(file_path, "rb") as f:
+            f.seek(scanned_to)
+            tail = f.read()
+        if tail and parse_word_line(tail.decode("utf-8", errors="replace")):
+            self._tail = scanned_to
+
+    def _offset(self, i):
+        if i == self._count:
+            return self._tail
+        if self._offsets is not None:
+            return self._offsets[i]
+        return struct.unpack_from("<Q", self._mm, HEADER.size + i * 8)[0]
+
+    def __len__(self):
+        return self._count + (1 if self._tail is not None else 0)
+
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(length))]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("word list index out of range")
+        with open(self.file_path, "rb") as f:
+            f.seek(self._offset(index))
+            line = f.readline()
+        entry = parse_word_line(line.decode("utf-8", errors="replace"))
+        if entry is None:
+            raise StaleIndexError(f"stale index for {self.file_path}")
+        return entry
+
+    def spot_check(self):
+        length = len(self)
+        try:
+            for k in range(min(SPOT_CHECKS, length)):
+                self[k * (length - 1) // max(1, SPOT_CHECKS - 1)]
+        except StaleIndexError:
+            return False
+        return True
+
+    def resident_size(self):
+        return sys.getsizeof(self) + 256
+
+    def close(self):
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        self._view.release()
+        self._mm.close()
+
+def open_indexed_word_list(file_path, signature):
+    update_index(file_path, signature)
+    words = IndexedWordList(file_path, index_path_for(file_path))
+    if not words.spot_check():
+        words.close()
+        build_index(file_path, signature)
+        words = IndexedWordList(file_path, index_path_for(file_path))
+    return words
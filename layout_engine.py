@@ -0,0 +1,139 @@
+import random
+from collections import namedtuple
+
+# Pure-Python bubble placement: no Qt types, so it can be exercised without a
+# display. Positions are absolute (x, y) tuples inside the given screen rect,
+# and cascade slots are tracked separately for every screen.
+
+MARGIN = 20
+CASCADE_GAP = 10
+BUBBLE_SPACING = 200
+
+Rect = namedtuple("Rect", ["x", "y", "width", "height"])
+Slot = namedtuple("Slot", ["key", "index"])
+Placement = namedtuple("Placement", ["start", "end", "slot"])
+
+class SlotAllocator:
+    # Tracks which cascade slots are held by a visible bubble. A new bubble
+    # gets the free slot nearest to the start of its cascade; when every slot
+    # is busy the one held the longest is shared.
+    def __init__(self):
+        self._occupied = {}
+        self._order = 0
+
+    def acquire(self, key, slot_count):
+        slot_count = max(1, slot_count)
+        occupied = self._occupied.setdefault(key, {})
+        self._order += 1
+        for index in range(slot_count):
+            if index not in occupied:
+                occupied[index] = self._order
+                return Slot(key, index)
+        in_range = [index for index in occupied if index < slot_count]
+        index = min(in_range, key=occupied.get)
+        occupied[index] = self._order
+        return Slot(key, index)
+
+    def release(self, slot):
+        if slot is None:
+            return
+        occupied = self._occupied.get(slot.key)
+        if occupied is not None:
+            occupied.pop(slot.index, None)
+
+    def occupied(self, key):
+        return sorted(self._occupied.get(key, {}))
+
+    def clear(self):
+        self._occupied.clear()
+
+def _span(start, available, size):
+    return start + MARGIN, start + max(MARGIN, available - size - MARGIN)
+
+def _random(engine, screen, width, height):
+    left, right = _span(screen.x, screen.width, width)
+    top, bottom = _span(screen.y, screen.height, height)
+    return Placement((engine.rng.randint(left, right), engine.rng.randint(top, bottom)), None, None)
+
+def _anchor(column, row):
+    def place(engine, screen, width, height):
+        return Placement((_column_x(screen, width, column), _row_y(screen, height, row)), None, None)
+    return place
+
+def _column_x(screen, width, column):
+    if column == "left":
+        return screen.x + MARGIN
+    if column == "right":
+        return screen.x + screen.width - width - MARGIN
+    return screen.x + (screen.width - width) // 2
+
+def _row_y(screen, height, row):
+    if row == "top":
+        return screen.y + MARGIN
+    if row == "bottom":
+        return screen.y + screen.height - height - MARGIN
+    return screen.y + (screen.height - height) // 2
+
+def _moving(column, row, end_column, end_row):
+    def place(engine, screen, width, height):
+        start = (_column_x(screen, width, column), _row_y(screen, height, row))
+        end = (_column_x(screen, width, end_column), _row_y(screen, height, end_row))
+        return Placement(start, end, None)
+    return place
+
+def _cascade_down(key, column):
+    def place(engine, screen, width, height):
+        step = height + CASCADE_GAP
+        slot = engine.slots.acquire((screen, key), (screen.height - 2 * MARGIN) // step)
+        return Placement((_column_x(screen, width, column), screen.y + MARGIN + slot.index * step), None, slot)
+    return place
+
+def _cascade_across(key, direction, row):
+    def place(engine, screen, width, height):
+        slot_count = min(
+            max(1, (screen.width - 2 * MARGIN) // BUBBLE_SPACING),
+            max(0, screen.width - width - 2 * MARGIN) // BUBBLE_SPACING + 1
+        )
+        slot = engine.slots.acquire((screen, key), slot_count)
+        if direction == "right_to_left":
+            x = _column_x(screen, width, "right") - slot.index * BUBBLE_SPACING
+        else:
+            x = _column_x(screen, width, "left") + slot.index * BUBBLE_SPACING
+        return Placement((x, _row_y(screen, height, row)), None, slot)
+    return place
+
+STRATEGIES = {
+    "random": _random,
+    "top_left": _anchor("left", "top"),
+    "top_right": _anchor("right", "top"),
+    "bottom_left": _anchor("left", "bottom"),
+    "bottom_right": _anchor("right", "bottom"),
+    "center": _anchor("center", "center"),
+    "cascade_top_left": _cascade_down("top_left", "left"),
+    "cascade_top_right": _cascade_down("top_right", "right"),
+    "cascade_top_center": _cascade_down("top_center", "center"),
+    "left_to_right_top_left": _moving("left", "top", "right", "top"),
+    "left_to_right_bottom_left": _moving("left", "bottom", "right", "bottom"),
+    "right_to_left_top_right": _moving("right", "top", "left", "top"),
+    "right_to_left_bottom_right": _moving("right", "bottom", "left", "bottom"),
+    "cascade_right_to_left_top_right": _cascade_across("right_to_left_top_right", "right_to_left", "top"),
+    "cascade_left_to_right_top_left": _cascade_across("left_to_right_top_left", "left_to_right", "top"),
+    "cascade_right_to_left_bottom_right": _cascade_across("right_to_left_bottom_right", "right_to_left", "bottom"),
+    "cascade_left_to_right_bottom_left": _cascade_across("left_to_right_bottom_left", "left_to_right", "bottom"),
+    "top_to_bottom_top_left": _moving("left", "top", "left", "bottom"),
+    "top_to_bottom_top_center": _moving("center", "top", "center", "bottom"),
+    "top_to_bottom_top_right": _moving("right", "top", "right", "bottom")
+}
+
+class LayoutEngine:
+    def __init__(self, rng=None):
+        self.slots = SlotAllocator()
+        self.rng = rng or random.Random()
+
+    def place(self, position_mode, screen, width, height):
+        strategy = STRATEGIES.get(position_mode, _random)
+        return strategy(self, screen, width, height)
+
+    def release(self, placement):
+        if placement is not None:
+            self.slots.release(placement.slot)
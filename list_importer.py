@@ -0,0 +1,107 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+import utils
+from importers import (
+    ImportCancelled, EmptyImport, IMPORT_ERRORS, import_into_list, import_file_job
+)
+
+# Runs imports on a QThreadPool worker so the GUI (and the bubble timer) keep
+# going. Entries are written to a temp file that replaces the list only once
+# the whole import succeeded, so a cancelled or failed import leaves the old
+# list as it was.
+
+class ImportSignals(QObject):
+    # permille of the source file read so far
+    progress = pyqtSignal(int)
+    rejected = pyqtSignal(int)
+    # list file name, imported entries, rejected lines
+    finished = pyqtSignal(str, int, int)
+    # list file name, reason: "empty", "cancelled" or an error message
+    failed = pyqtSignal(str, str)
+
+class ListImportTask(QRunnable):
+    def __init__(self, source_path, file_name, policy="skip"):
+        super().__init__()
+        self.source_path = source_path
+        self.file_name = file_name
+        self.policy = policy
+        self.signals = ImportSignals()
+        self.cancel_event = threading.Event()
+        self.last_rejected = 0
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            count, rejected = import_into_list(
+                self.source_path, self.file_name, self.report_progress, self.cancel_event.is_set, self.policy
+            )
+        except ImportCancelled:
+            self.signals.failed.emit(self.file_name, "cancelled")
+        except EmptyImport:
+            self.signals.failed.emit(self.file_name, "empty")
+        except IMPORT_ERRORS as e:
+            self.signals.failed.emit(self.file_name, str(e) or type(e).__name__)
+        else:
+            self.signals.finished.emit(self.file_name, count, rejected)
+
+    def report_progress(self, fraction, rejected):
+        if rejected != self.last_rejected:
+            self.last_rejected = rejected
+            self.signals.rejected.emit(rejected)
+        self.signals.progress.emit(int(fraction * 1000))
+
+class FolderImportSignals(QObject):
+    # permille of the files done
+    progress = pyqtSignal(int)
+    # list file name, imported entries, rejected lines, error ("" if none)
+    file_done = pyqtSignal(str, int, int, str)
+    # lists imported, lists that failed, cancelled
+    finished = pyqtSignal(int, int, bool)
+
+class FolderImportTask(QRunnable):
+    # Imports each (source path, list file name) job in its own process, so
+    # parsing several big files uses every core. Cancelling drops the files
+    # not started yet; the ones already running finish normally.
+    def __init__(self, jobs, policy="skip"):
+        super().__init__()
+        self.jobs = jobs
+        self.policy = policy
+        self.signals = FolderImportSignals()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        imported = failed = done = 0
+        workers = max(1, min(len(self.jobs), os.cpu_count() or 1))
+        # spawn, not fork: forking a process that runs Qt threads is unsafe
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            pending = {executor.submit(import_file_job, path, name, self.policy, utils.WORD_STORAGE) for path, name in self.jobs}
+            while pending:
+                finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done += 1
+                    try:
+                        file_name, count, rejected, error = future.result()
+                    except Exception as e:
+                        file_name, count, rejected, error = "", 0, 0, str(e) or type(e).__name__
+                    if error:
+                        failed += 1
+                    else:
+                        imported += 1
+                    self.signals.file_done.emit(file_name, count, rejected, error or "")
+                    self.signals.progress.emit(done * 1000 // len(self.jobs))
+                if self.cancel_event.is_set():
+                    for future in pending:
+                        future.cancel()
+                    pending = {future for future in pending if not future.cancelled()}
+        finally:
+            executor.shutdown(wait=True)
+        self.signals.finished.emit(imported, failed, self.cancel_event.is_set())
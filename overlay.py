@@ -0,0 +1,145 @@
+import time
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPoint, QRect
+from PyQt5.QtGui import QPainter, QRegion
+from animation_clock import interpolate_point
+from bubble_renderer import render_bubble
+
+class OverlayBubble:
+    def __init__(self, pixmap, placement, start, end, opacity, duration):
+        self.pixmap = pixmap
+        self.placement = placement
+        self.start = start
+        self.end = end
+        self.opacity = opacity
+        self.duration = max(duration, 0.001)
+        self.started_at = time.monotonic()
+        self.progress = 0.0
+        self.size = pixmap.size() / pixmap.devicePixelRatio()
+
+    def position(self):
+        if self.end is None:
+            return self.start
+        return interpolate_point(self.start, self.end, self.progress)
+
+    def rect(self):
+        return QRect(self.position(), self.size)
+
+class BubbleOverlay(QWidget):
+    # One click-through transparent window covering a screen's usable area
+    # that paints every active bubble on that screen, instead of one
+    # translucent top-level window per bubble.
+    def __init__(self, clock, layout_engine, screen):
+        super().__init__()
+        self.clock = clock
+        self.layout_engine = layout_engine
+        self.screen_info = screen
+        self.top_most = None
+        self.set_top_most(True)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.bubbles = []
+
+    def set_top_most(self, top_most):
+        if top_most == self.top_most:
+            return
+        self.top_most = top_most
+        flags = Qt.FramelessWindowHint | Qt.Tool | Qt.WindowTransparentForInput | Qt.WindowDoesNotAcceptFocus
+        if top_most:
+            flags |= Qt.WindowStaysOnTopHint
+        visible = self.isVisible()
+        self.setWindowFlags(flags)
+        if visible:
+            self.show()
+
+    def show_bubble(self, word, meaning, font_size, word_color, meaning_color, bg_color, opacity, top_most, alignment, font_file, language, duration, position_mode):
+        self.set_top_most(top_most)
+        rect = self.screen_info.rect
+        if self.geometry().getRect() != tuple(rect):
+            self.setGeometry(*rect)
+        pixmap = render_bubble(
+            word, meaning, font_size, word_color, meaning_color, bg_color,
+            alignment, font_file, language, self.screen_info.dpr
+        )
+        size = pixmap.size() / pixmap.devicePixelRatio()
+        # Same footprint as a Bubble window so positions match both modes
+        placement = self.layout_engine.place(position_mode, rect, size.width() + 20, size.height() + 20)
+        offset = QPoint(rect.x, rect.y)
+        start = QPoint(*placement.start) - offset
+        end = QPoint(*placement.end) - offset if placement.end else None
+        bubble = OverlayBubble(pixmap, placement, start, end, opacity, duration)
+        self.bubbles.append(bubble)
+        if not self.isVisible():
+            self.show()
+        self.clock.add(self)
+        self.update(bubble.rect())
+
+    def step(self, now):
+        # Advances every bubble in one batch and repaints, in one update, only
+        # the areas the bubbles left or moved into
+        dirty = QRegion()
+        for bubble in self.bubbles:
+            previous = bubble.rect()
+            bubble.progress = min(1.0, (now - bubble.started_at) / bubble.duration)
+            dirty += previous.united(bubble.rect())
+            if bubble.progress >= 1.0:
+                self.layout_engine.release(bubble.placement)
+        self.bubbles = [bubble for bubble in self.bubbles if bubble.progress < 1.0]
+        self.update(dirty)
+        if not self.bubbles:
+            self.hide()
+            return False
+        return True
+
+    def clear(self):
+        for bubble in self.bubbles:
+            self.layout_engine.release(bubble.placement)
+        self.bubbles = []
+        self.clock.remove(self)
+        self.hide()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setClipRegion(event.region())
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(event.rect(), Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        for bubble in self.bubbles:
+            if not event.region().intersects(bubble.rect()):
+                continue
+            painter.setOpacity(bubble.opacity * (1.0 - bubble.progress))
+            painter.drawPixmap(bubble.position(), bubble.pixmap)
+        painter.end()
+
+class OverlayCompositor:
+    # Keeps one BubbleOverlay per screen and routes each bubble to the screen
+    # chosen by the ScreenManager.
+    def __init__(self, clock, layout_engine, screens):
+        self.clock = clock
+        self.layout_engine = layout_engine
+        self.screens = screens
+        self.overlays = {}
+        self.screens.screens_changed.connect(self.update_screens)
+
+    def show_bubble(self, *content):
+        screen = self.screens.next_screen()
+        overlay = self.overlays.get(screen.name)
+        if overlay is None:
+            overlay = BubbleOverlay(self.clock, self.layout_engine, screen)
+            self.overlays[screen.name] = overlay
+        overlay.screen_info = screen
+        overlay.show_bubble(*content)
+
+    def update_screens(self):
+        current = {screen.name: screen for screen in self.screens.screens()}
+        for name in list(self.overlays):
+            overlay = self.overlays[name]
+            if name not in current or overlay.screen_info.rect != current[name].rect:
+                overlay.clear()
+                overlay.deleteLater()
+                del self.overlays[name]
+
+    def clear(self):
+        for overlay in self.overlays.values():
+            overlay.clear()
@@ -0,0 +1,161 @@
+import os
+import heapq
+import struct
+import time
+from atomic_file import atomic_write
+
+# Review log (.srs) for the spaced-repetition play mode: a magic header
+# followed by fixed-width records, one appended per review. Replaying the log
+# only touches entries that were ever shown, so opening a huge deck costs
+# nothing for the entries that are still new.
+MAGIC = b"WBS1"
+RECORD = struct.Struct("<Idffi")
+SCHEDULE_EXTENSION = ".srs"
+
+LEARNING_STEPS = [60, 10 * 60]
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+COMPACT_FACTOR = 4
+
+class ReviewScheduler:
+    def __init__(self, path):
+        self.path = path
+        # index -> (due, interval, ease, reps)
+        self.states = {}
+        self.heap = []
+        self.next_new = 0
+        self.log_records = 0
+        # index -> when it was last shown, and a lazy heap over it used to
+        # rotate through entries when nothing is due (kept in memory only;
+        # a reopened log starts from each entry's last review)
+        self.shown = {}
+        self.rotation = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            return
+        body = memoryview(data)[len(MAGIC):]
+        usable = len(body) - len(body) % RECORD.size
+        for index, due, interval, ease, reps in RECORD.iter_unpack(body[:usable]):
+            self.states[index] = (due, interval, ease, reps)
+            self.log_records += 1
+        self.heap = [(state[0], index) for index, state in self.states.items()]
+        heapq.heapify(self.heap)
+        if self.states:
+            self.next_new = max(self.states) + 1
+
+    def next_index(self, size, now=None):
+        # Due entries first, then entries never shown, then (ahead of
+        # schedule) the one shown least recently
+        if size <= 0:
+            return None
+        now = time.time() if now is None else now
+        self._drop_stale(size)
+        if self.heap and self.heap[0][0] <= now:
+            return self.heap[0][1]
+        if self.next_new < size:
+            return self.next_new
+        index = self._least_recently_shown(size)
+        if index is None:
+            self.next_new = 0
+            index = 0
+        self.mark_shown(index, now)
+        return index
+
+    def mark_shown(self, index, now=None):
+        self.shown[index] = time.time() if now is None else now
+        if self.rotation is not None:
+            heapq.heappush(self.rotation, (self.shown[index], index))
+
+    def _last_shown(self, index):
+        if index in self.shown:
+            return self.shown[index]
+        due, interval, _, _ = self.states[index]
+        return due - interval
+
+    def _least_recently_shown(self, size):
+        if self.rotation is None:
+            self.rotation = [(self._last_shown(index), index) for index in self.states]
+            heapq.heapify(self.rotation)
+        while self.rotation:
+            shown, index = self.rotation[0]
+            if index < size and index in self.states and self._last_shown(index) == shown:
+                return index
+            heapq.heappop(self.rotation)
+        return None
+
+    def is_due(self, index, now=None):
+        now = time.time() if now is None else now
+        state = self.states.get(index)
+        return state is None or state[0] <= now
+
+    def _drop_stale(self, size):
+        while self.heap:
+            due, index = self.heap[0]
+            state = self.states.get(index)
+            if index < size and state is not None and state[0] == due:
+                return
+            heapq.heappop(self.heap)
+
+    def review(self, index, quality, now=None):
+        # quality follows SM-2: 0-2 means forgotten, 3-5 recalled
+        now = time.time() if now is None else now
+        _, interval, ease, reps = self.states.get(index, (0.0, 0.0, DEFAULT_EASE, 0))
+        if quality < 3:
+            reps = 0
+            interval = LEARNING_STEPS[0]
+        else:
+            if reps < len(LEARNING_STEPS):
+                interval = LEARNING_STEPS[reps]
+            else:
+                interval = interval * ease
+            reps += 1
+        ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        due = now + interval
+        self.states[index] = (due, interval, ease, reps)
+        heapq.heappush(self.heap, (due, index))
+        if index >= self.next_new:
+            self.next_new = index + 1
+        self.mark_shown(index, now)
+        self._append(index)
+
+    def _append(self, index):
+        due, interval, ease, reps = self.states[index]
+        new_file = not os.path.exists(self.path)
+        with open(self.path, "ab") as f:
+            if new_file:
+                f.write(MAGIC)
+            f.write(RECORD.pack(index, due, interval, ease, reps))
+        self.log_records += 1
+        if self.log_records > COMPACT_FACTOR * max(64, len(self.states)):
+            self.compact()
+
+    def remove_index(self, removed):
+        # The entry at `removed` was deleted from the list: drop its record
+        # and move every later record up one row, then rewrite the log
+        self.states = {
+            (index - 1 if index > removed else index): state
+            for index, state in self.states.items() if index != removed
+        }
+        self.shown = {
+            (index - 1 if index > removed else index): shown
+            for index, shown in self.shown.items() if index != removed
+        }
+        self.rotation = None
+        if self.next_new > removed:
+            self.next_new -= 1
+        self.compact()
+
+    def compact(self):
+        with atomic_write(self.path, binary=True) as f:
+            f.write(MAGIC)
+            for index, (due, interval, ease, reps) in self.states.items():
+                f.write(RECORD.pack(index, due, interval, ease, reps))
+        self.log_records = len(self.states)
+        self.heap = [(state[0], index) for index, state in self.states.items()]
+        heapq.heapify(self.heap)
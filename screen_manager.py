@@ -0,0 +1,72 @@
+from collections import namedtuple
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QGuiApplication
+from layout_engine import Rect
+
+ScreenInfo = namedtuple("ScreenInfo", ["name", "rect", "dpr"])
+
+class ScreenManager(QObject):
+    # Caches the usable area of every screen and refreshes it only when Qt
+    # reports a screen being added, removed or changing geometry.
+    screens_changed = pyqtSignal()
+
+    def __init__(self, target="primary", parent=None):
+        super().__init__(parent)
+        self.target = target
+        self._screens = []
+        self._primary = None
+        self._next = 0
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self._screen_added)
+        app.screenRemoved.connect(self.refresh)
+        app.primaryScreenChanged.connect(self.refresh)
+        for screen in app.screens():
+            self._watch(screen)
+        self.refresh()
+
+    def _watch(self, screen):
+        screen.availableGeometryChanged.connect(self.refresh)
+        screen.geometryChanged.connect(self.refresh)
+        screen.physicalDotsPerInchChanged.connect(self.refresh)
+
+    def _screen_added(self, screen):
+        self._watch(screen)
+        self.refresh()
+
+    def refresh(self, *args):
+        screens = []
+        for screen in QGuiApplication.screens():
+            geom = screen.availableGeometry()
+            screens.append(ScreenInfo(
+                screen.name(), Rect(geom.x(), geom.y(), geom.width(), geom.height()),
+                screen.devicePixelRatio()
+            ))
+        primary = QGuiApplication.primaryScreen()
+        self._screens = screens
+        self._primary = next((info for info in screens if primary and info.name == primary.name()), None)
+        self.screens_changed.emit()
+
+    def screens(self):
+        return list(self._screens)
+
+    def primary(self):
+        if self._primary is not None:
+            return self._primary
+        return self._screens[0] if self._screens else ScreenInfo("", Rect(0, 0, 800, 600), 1.0)
+
+    def set_target(self, target):
+        self.target = target
+        self._next = 0
+
+    def next_screen(self):
+        # "primary", "all" (round-robin over every screen) or a screen index
+        if not self._screens or self.target == "primary":
+            return self.primary()
+        if self.target == "all":
+            info = self._screens[self._next % len(self._screens)]
+            self._next = (self._next + 1) % len(self._screens)
+            return info
+        try:
+            return self._screens[int(self.target)]
+        except (ValueError, IndexError):
+            return self.primary()
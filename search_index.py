@@ -0,0 +1,144 @@
+import re
+from bisect import bisect_right
+from array import array
+from itertools import accumulate
+
+# Substring search over a word list for the manager's filter box. Entries are
+# normalized once and packed into chunks of CHUNK_SIZE lines, each one joined
+# string plus its line offsets, so a query is a few str.find calls per chunk
+# instead of a Python loop over every entry. An edit, add or delete only rebuilds the one chunk it touches.
+CHUNK_SIZE = 2048
+
+# Persian/Arabic letter variants fold together; ZWNJ, tatweel and harakat
+# are dropped so "می‌روم" matches "میروم" and vowelled text matches plain.
+# Whole chunks are normalized at once with str.replace/re.sub, which is much
+# faster than translating entry by entry.
+_FOLD = [("ي", "ی"), ("ى", "ی"), ("ك", "ک"), ("ة", "ه"), ("ۀ", "ه"), ("أ", "ا"), ("إ", "ا"), ("ٱ", "ا")]
+_DROP = re.compile("[\u200c\u200d\u0640\u0670\u064b-\u065f]")
+
+def normalize(text):
+    text = _DROP.sub("", text)
+    for variant, letter in _FOLD:
+        text = text.replace(variant, letter)
+    return text.casefold()
+
+def _entry_text(word, meaning):
+    return normalize(word.replace("\n", " ") + "\t" + meaning.replace("\n", " "))
+
+def normalize_query(query):
+    return normalize(query).replace("\n", " ").replace("\t", " ")
+
+class _Chunk:
+    def __init__(self, lines):
+        self.lines = lines
+        self.pack()
+
+    @classmethod
+    def from_entries(cls, entries):
+        # Entries come from line-based parsing and never contain a newline
+        text = "\n".join(word + "\t" + meaning for word, meaning in entries)
+        return cls(normalize(text).split("\n") if entries else [])
+
+    def pack(self):
+        self.text = "\n".join(self.lines)
+        self.offsets = array("I", accumulate(map(len, self.lines[:-1]), lambda total, size: total + size + 1, initial=0))
+        if not self.lines:
+            self.offsets = array("I")
+
+    def find(self, query):
+        # Line numbers in this chunk containing query
+        position = 0
+        while True:
+            position = self.text.find(query, position)
+            if position < 0:
+                return
+            line = bisect_right(self.offsets, position) - 1
+            yield line
+            if line + 1 >= len(self.lines):
+                return
+            position = self.offsets[line + 1]
+
+class SearchIndex:
+    # Built one chunk at a time through build_chunk(), so a caller on the GUI
+    # thread can spread the work over several event-loop passes
+    def __init__(self, words):
+        self.chunks = []
+        self._starts = None
+        self.words = words if len(words) else None
+        self.next_row = 0
+
+    def is_complete(self):
+        return self.words is None
+
+    def build_chunk(self):
+        start = self.next_row
+        self.chunks.append(_Chunk.from_entries(self.words[start:start + CHUNK_SIZE]))
+        self.next_row = start + CHUNK_SIZE
+        self._starts = None
+        if self.next_row >= len(self.words):
+            self.words = None
+
+    def build(self):
+        while not self.is_complete():
+            self.build_chunk()
+
+    def __len__(self):
+        return sum(len(chunk.lines) for chunk in self.chunks)
+
+    def _chunk_starts(self):
+        if self._starts is None:
+            self._starts = array("Q")
+            total = 0
+            for chunk in self.chunks:
+                self._starts.append(total)
+                total += len(chunk.lines)
+        return self._starts
+
+    def _locate(self, row):
+        starts = self._chunk_starts()
+        number = bisect_right(starts, row) - 1
+        return number, row - starts[number]
+
+    def chunk_count(self):
+        return len(self.chunks)
+
+    def search_chunk(self, query, number):
+        # Matching rows in one chunk; query must come from normalize_query
+        start = self._chunk_starts()[number]
+        return [start + line for line in self.chunks[number].find(query)]
+
+    def search(self, query, limit=None):
+        query = normalize_query(query)
+        rows = []
+        if not query:
+            return rows
+        self.build()
+        for number in range(len(self.chunks)):
+            rows += self.search_chunk(query, number)
+            if limit is not None and len(rows) >= limit:
+                return rows[:limit]
+        return rows
+
+    def append(self, word, meaning):
+        if not self.chunks or len(self.chunks[-1].lines) >= CHUNK_SIZE:
+            self.chunks.append(_Chunk([]))
+        chunk = self.chunks[-1]
+        chunk.lines.append(_entry_text(word, meaning))
+        chunk.pack()
+        self._starts = None
+
+    def update(self, row, word, meaning):
+        number, line = self._locate(row)
+        chunk = self.chunks[number]
+        chunk.lines[line] = _entry_text(word, meaning)
+        chunk.pack()
+
+    def remove(self, row):
+        number, line = self._locate(row)
+        chunk = self.chunks[number]
+        del chunk.lines[line]
+        if chunk.lines:
+            chunk.pack()
+        else:
+            del self.chunks[number]
+        self._starts = None
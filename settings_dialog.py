@@ -2,9 +2,10 @@ import os
 from PyQt5.QtWidgets import QDialog, QSlider, QPushButton, QFormLayout, QComboBox, QFileDialog, QMessageBox, QColorDialog, QLabel
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
-from bubble import Bubble
 import shutil
-from utils import TRANSLATIONS, list_font_files, FONTS_FOLDER, set_window_title_bar_theme
+from font_registry import get_font, forget_font
+from bubble_renderer import clear_pixmap_cache
+from utils import TRANSLATIONS, list_font_files, scan_font_files, FONTS_FOLDER, set_window_title_bar_theme
 
 class SettingsDialog(QDialog):
     def __init__(self, parent):
@@ -63,6 +64,7 @@ class SettingsDialog(QDialog):
         font_files = list_font_files()
         if font_files:
             self.font_combo.addItems(font_files)
+            self.apply_font_previews()
             current_font = parent.selected_font if parent.selected_font in font_files else font_files[0]
             self.font_combo.setCurrentText(current_font)
         else:
@@ -92,6 +94,16 @@ class SettingsDialog(QDialog):
         self.language_combo.setCurrentIndex(language_map.get(self.language, 0))
         self.language_combo.currentIndexChanged.connect(self.update_language)
 
+        self.render_mode_combo = QComboBox()
+        self.render_mode_combo.addItems(self.trans["render_mode_options"])
+        self.render_mode = parent.render_mode
+        self.render_mode_combo.setCurrentIndex(1 if self.render_mode == "overlay" else 0)
+
+        self.screen_manager = parent.screen_manager
+        self.screen_combo = QComboBox()
+        self.screen_combo.addItems(self.screen_items())
+        self.screen_combo.setCurrentIndex(self.screen_index(self.screen_manager.target))
+
         self.preview_btn = QPushButton(self.trans["preview_btn"])
         self.preview_btn.clicked.connect(self.preview_bubble)
 
@@ -120,6 +132,8 @@ class SettingsDialog(QDialog):
         form.addRow(self.trans["import_font_btn"], self.import_font_btn)
         form.addRow(self.trans["bubble_position"], self.position_combo)
         form.addRow(self.trans["language_select"], self.language_combo)
+        form.addRow(self.trans["render_mode"], self.render_mode_combo)
+        form.addRow(self.trans["bubble_screen"], self.screen_combo)
         form.addRow(self.preview_btn)
         form.addRow(self.save_btn)
         self.setLayout(form)
@@ -221,6 +235,24 @@ class SettingsDialog(QDialog):
             """)
         set_window_title_bar_theme(self, dark_mode)
 
+    def apply_font_previews(self):
+        size = self.font_combo.font().pointSize()
+        for i in range(self.font_combo.count()):
+            self.font_combo.setItemData(i, get_font(self.font_combo.itemText(i), size), Qt.FontRole)
+
+    def screen_items(self):
+        items = list(self.trans["bubble_screen_options"])
+        for i in range(len(self.screen_manager.screens())):
+            items.append(self.trans["screen_number"].format(number=i + 1))
+        return items
+
+    def screen_index(self, target):
+        if target == "all":
+            return 1
+        if isinstance(target, str) and target.isdigit() and int(target) < len(self.screen_manager.screens()):
+            return int(target) + 2
+        return 0
+
     def update_font(self, font_name):
         self.selected_font = font_name
 
@@ -251,10 +283,13 @@ class SettingsDialog(QDialog):
                     return
 
             shutil.copyfile(file_path, dest_path)
-            font_files = list_font_files()
+            forget_font(font_name)
+            clear_pixmap_cache()
+            font_files = scan_font_files()
             self.font_combo.clear()
             if font_files:
                 self.font_combo.addItems(font_files)
+                self.apply_font_previews()
                 self.font_combo.setCurrentText(font_name)
                 self.selected_font = font_name
             else:
@@ -291,7 +326,9 @@ class SettingsDialog(QDialog):
             ("font_select", 11),
             ("import_font_btn", 12),
             ("bubble_position", 13),
-            ("language_select", 14)
+            ("language_select", 14),
+            ("render_mode", 15),
+            ("bubble_screen", 16)
         ]
         for key, row in row_labels:
             label_item = form_layout.itemAt(row, QFormLayout.LabelRole)
@@ -334,6 +371,16 @@ class SettingsDialog(QDialog):
         self.position_combo.setCurrentIndex(position_map.get(current_position, 0))
         self.position_combo.blockSignals(False)
 
+        current_render_mode = self.render_mode_combo.currentIndex()
+        self.render_mode_combo.clear()
+        self.render_mode_combo.addItems(self.trans["render_mode_options"])
+        self.render_mode_combo.setCurrentIndex(current_render_mode)
+
+        current_screen = self.screen_combo.currentIndex()
+        self.screen_combo.clear()
+        self.screen_combo.addItems(self.screen_items())
+        self.screen_combo.setCurrentIndex(current_screen)
+
         self.language_combo.blockSignals(True)
         self.language_combo.clear()
         self.language_combo.addItems(self.trans["language_options"])
@@ -364,14 +411,14 @@ class SettingsDialog(QDialog):
             self.selected_bg_color = color
 
     def preview_bubble(self):
-        Bubble(
+        self.parent().present_bubble(
             self.trans["preview_word"], self.trans["preview_meaning"],
             self.font_slider.value(), self.selected_word_color,
             self.selected_meaning_color, self.selected_bg_color,
             self.opacity_slider.value() / 100.0, self.top_most,
             self.alignment, self.selected_font, self.language,
             self.time_slider.value(), self.bubble_position
-        ).show()
+        )
 
     def accept(self):
         position_map = {
@@ -384,6 +431,11 @@ class SettingsDialog(QDialog):
             17: "top_to_bottom_top_left", 18: "top_to_bottom_top_center", 19: "top_to_bottom_top_right"
         }
         self.bubble_position = position_map.get(self.position_combo.currentIndex(), "random")
+        old_style = (
+            self.parent().font_size, self.parent().word_color.name(), self.parent().meaning_color.name(),
+            self.parent().bg_color.name(), self.parent().text_alignment, self.parent().selected_font,
+            self.parent().language
+        )
         self.parent().bubble_duration = self.time_slider.value()
         self.parent().bubble_interval = self.interval_slider.value()
         self.parent().font_size = self.font_slider.value()
@@ -396,5 +448,16 @@ class SettingsDialog(QDialog):
         self.parent().selected_font = self.selected_font
         self.parent().language = self.language
         self.parent().bubble_position = self.bubble_position
+        self.render_mode = "overlay" if self.render_mode_combo.currentIndex() == 1 else "windows"
+        self.parent().render_mode = self.render_mode
+        screen_targets = ["primary", "all"] + [str(i) for i in range(len(self.screen_manager.screens()))]
+        self.screen_manager.set_target(screen_targets[max(0, self.screen_combo.currentIndex())])
         self.parent().timer.setInterval(self.parent().bubble_interval * 1000)
+        new_style = (
+            self.parent().font_size, self.parent().word_color.name(), self.parent().meaning_color.name(),
+            self.parent().bg_color.name(), self.parent().text_alignment, self.parent().selected_font,
+            self.parent().language
+        )
+        if new_style != old_style:
+            clear_pixmap_cache()
         super().accept()
\ No newline at end of file
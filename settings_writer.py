@@ -0,0 +1,50 @@
+from PyQt5.QtCore import QObject, QTimer
+from utils import dump_settings, write_settings_text
+
+# Coalesces settings saves: every change restarts a short quiet-period timer
+# and only the last state is written. Serializing happens on the GUI thread
+# (so the dict is never read while it changes); the disk write itself runs
+# on a single worker thread, which also keeps the writes in order.
+SETTINGS_SAVE_DELAY_MS = 750
+
+class SettingsWriter(QObject):
+    def __init__(self, settings, delay_ms=SETTINGS_SAVE_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.last_written = dump_settings(settings)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.flush)
+        # Started by the first write rather than at startup
+        self.executor = None
+        self.pending = None
+
+    def mark_dirty(self, settings=None):
+        if settings is not None:
+            self.settings = settings
+        self.timer.start()
+
+    def flush(self):
+        self.timer.stop()
+        text = dump_settings(self.settings)
+        if text == self.last_written:
+            return
+        self.last_written = text
+        if self.executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = self.executor.submit(write_settings_text, text)
+        self.pending.add_done_callback(self._write_done)
+
+    def _write_done(self, future):
+        if future.exception() is not None:
+            # Forget what was written so the next flush tries again
+            self.last_written = None
+
+    def close(self):
+        # Called on aboutToQuit: write anything still waiting and block until done
+        if self.timer.isActive():
+            self.flush()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
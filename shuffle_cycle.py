@@ -0,0 +1,119 @@
+import json
+import random
+from bisect import bisect_left, insort
+from atomic_file import atomic_write
+
+# Shuffle-without-repeat order over a list of n entries. Entries are dealt
+# into interleaved blocks (block b holds b, b + blocks, b + 2 * blocks, ...),
+# the block order is a seeded Fisher-Yates shuffle, and each block is
+# shuffled with its own derived seed only when the cycle reaches it. The
+# seed, the cycle size and the (block, offset) cursor are enough to resume.
+# The order is over the rows the cycle started with; rows deleted since are
+# recorded by that numbering and skipped, and later rows are mapped back to
+# where they are now.
+CYCLE_EXTENSION = ".cycle"
+BLOCK_SIZE = 1024
+
+def _shuffled(items, seed):
+    rng = random.Random(seed)
+    for i in range(len(items) - 1, 0, -1):
+        j = rng.randint(0, i)
+        items[i], items[j] = items[j], items[i]
+    return items
+
+class ShuffleCycle:
+    def __init__(self, path):
+        self.path = path
+        self.seed = None
+        self.size = 0
+        self.block = 0
+        self.offset = 0
+        self.removed = []
+        self._order = None
+        self._current = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.seed = int(state["seed"])
+            self.size = int(state["size"])
+            self.block = int(state["block"])
+            self.offset = int(state["offset"])
+            self.removed = sorted(int(index) for index in state.get("removed", []))
+        except (OSError, ValueError, KeyError, TypeError):
+            self.seed = None
+
+    def _save(self):
+        state = {
+            "seed": self.seed, "size": self.size, "block": self.block,
+            "offset": self.offset, "removed": self.removed
+        }
+        with atomic_write(self.path) as f:
+            json.dump(state, f)
+
+    def _block_count(self):
+        return max(1, -(-self.size // BLOCK_SIZE))
+
+    def _start_cycle(self, size):
+        self.seed = random.getrandbits(63)
+        self.size = size
+        self.block = 0
+        self.offset = 0
+        self.removed = []
+        self._order = None
+        self._current = None
+
+    def _block_members(self, position):
+        if self._order is None:
+            self._order = _shuffled(list(range(self._block_count())), self.seed)
+        if self._current is None or self._current[0] != position:
+            block = self._order[position]
+            members = list(range(block, self.size, self._block_count()))
+            self._current = (position, _shuffled(members, f"{self.seed}:{block}"))
+        return self._current[1]
+
+    def remove_index(self, row):
+        # For a row deleted from the list; the rows after it move up
+        if self.seed is None:
+            return
+        removed = self.removed
+        # The smallest k with removed[k] - k > row: that many removed entries
+        # come before the row's number in this cycle
+        low, high = 0, len(removed)
+        while low < high:
+            middle = (low + high) // 2
+            if removed[middle] - middle > row:
+                high = middle
+            else:
+                low = middle + 1
+        index = row + low
+        if index < self.size:
+            insort(removed, index)
+            self._save()
+
+    def next_index(self, size):
+        # A cycle that started before entries were added finishes first and
+        # the next one covers the whole list; deleted entries are skipped.
+        if size <= 0:
+            return None
+        if self.seed is None or self.size <= 0:
+            self._start_cycle(size)
+        while True:
+            if self.block >= self._block_count():
+                self._start_cycle(size)
+            members = self._block_members(self.block)
+            if self.offset >= len(members):
+                self.block += 1
+                self.offset = 0
+                continue
+            index = members[self.offset]
+            self.offset += 1
+            position = bisect_left(self.removed, index)
+            if position < len(self.removed) and self.removed[position] == index:
+                continue
+            row = index - position
+            if row < size:
+                self._save()
+                return row
@@ -0,0 +1,83 @@
+import os
+import time
+from PyQt5.QtCore import QDir, QLockFile, QSysInfo
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+# One running copy of the app. The first process takes an advisory lock file
+# and listens on SERVER_NAME; a later one finds the lock taken and connects
+# straight away to bring the running window to the front. Nothing waits when
+# no other instance exists. QLockFile records the owner's PID and program
+# name, so a lock left behind by a crashed instance is taken over at once.
+SERVER_NAME = "WordBubbleApp"
+# The lock is taken before the server listens, so a second instance started
+# at the same moment retries for a little while
+CONNECT_RETRY_MS = 1000
+CONNECT_ATTEMPT_MS = 50
+
+class InstanceLock:
+    def __init__(self, name=SERVER_NAME):
+        self.name = name
+        self.lock = QLockFile(os.path.join(QDir.tempPath(), name + ".lock"))
+        # Only a dead owner makes the lock stale, never its age
+        self.lock.setStaleLockTime(0)
+
+    def acquire(self):
+        # True when this is the first instance
+        if not self.lock.tryLock(0):
+            return False
+        # A socket file left by a crashed instance would make listen() fail
+        QLocalServer.removeServer(self.name)
+        return True
+
+    def take_over(self):
+        # For a lock whose owner never answered. Only taken when that owner is
+        # gone or its PID now belongs to another program; a live instance that
+        # is still starting up (and not listening yet) keeps its lock.
+        ok, pid, host, app_name = self.lock.getLockInfo()
+        if not ok:
+            # Released in the meantime
+            return self.acquire()
+        if host != QSysInfo.machineHostName() or not _owner_gone(pid, app_name):
+            return False
+        self.lock.removeStaleLockFile()
+        return self.acquire()
+
+    def listen(self, server):
+        return server.listen(self.name)
+
+    def activate_running(self, message=b"activate"):
+        # Returns False if the instance holding the lock never answered
+        socket = QLocalSocket()
+        deadline = time.monotonic() + CONNECT_RETRY_MS / 1000
+        while True:
+            socket.connectToServer(self.name)
+            if socket.waitForConnected(CONNECT_ATTEMPT_MS):
+                socket.write(message)
+                socket.waitForBytesWritten(500)
+                socket.disconnectFromServer()
+                return True
+            socket.abort()
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(CONNECT_ATTEMPT_MS / 1000)
+
+    def release(self):
+        self.lock.unlock()
+
+def _owner_gone(pid, app_name):
+    # True when no process has the PID or it runs another program than the
+    # one named in the lock
+    if os.name != "posix":
+        # QLockFile.tryLock has already checked the PID on other systems
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # Exists but belongs to another user
+        pass
+    try:
+        return os.path.basename(os.readlink(f"/proc/{pid}/exe")) != app_name
+    except OSError:
+        return False
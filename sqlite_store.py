@@ -0,0 +1,275 @@
+import time
+import uuid
+import sqlite3
+import threading
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+# Word lists kept in one SQLite database (WAL mode) instead of .txt files.
+# Lists are still addressed by their file name ("name.txt") so the rest of
+# the app does not care which storage is active. Entry order is id order;
+# each opened list holds its entry ids in an array, which makes fetching row
+# i a primary-key lookup and a run of rows a single range query.
+LISTS_TABLE = """
+CREATE TABLE IF NOT EXISTS lists (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    revision INTEGER NOT NULL DEFAULT 0
+)"""
+SCHEMA = LISTS_TABLE + """;
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    list_id INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    meaning TEXT NOT NULL,
+    weight REAL NOT NULL DEFAULT 1.0,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_list ON entries (list_id, id);
+CREATE INDEX IF NOT EXISTS entries_by_word ON entries (list_id, word);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+WRITE_BATCH = 2048
+# Imports fill a hidden list first and take the real name when they finish
+STAGING_MARK = ".importing-"
+
+_database_path = None
+_local = threading.local()
+
+def open_store(path):
+    global _database_path
+    _database_path = path
+    conn = connection()
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'lists'").fetchone()
+    if row is not None and "AUTOINCREMENT" not in row[0]:
+        _upgrade_lists_table(conn)
+    conn.executescript(SCHEMA)
+
+def _upgrade_lists_table(conn):
+    # Databases created before list ids were AUTOINCREMENT could hand a
+    # dropped list's id to the next new list
+    with transaction(conn):
+        conn.execute("ALTER TABLE lists RENAME TO lists_old")
+        conn.execute(LISTS_TABLE)
+        conn.execute("INSERT INTO lists (id, name, revision) SELECT id, name, revision FROM lists_old")
+        conn.execute("DROP TABLE lists_old")
+
+def drop_staging_lists():
+    # Leftovers of imports that never finished. Only the GUI process calls
+    # this, at startup: import workers share the database and their staging
+    # lists are still being filled.
+    conn = connection()
+    with transaction(conn):
+        for (list_id,) in conn.execute("SELECT id FROM lists WHERE name LIKE ?", (f"%{STAGING_MARK}%",)).fetchall():
+            _drop_list(conn, list_id)
+
+def connection():
+    # One connection per thread; sqlite3 connections must not be shared
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != _database_path:
+        conn = sqlite3.connect(_database_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+        _local.path = _database_path
+    return conn
+
+@contextmanager
+def transaction(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def _drop_list(conn, list_id):
+    conn.execute("DELETE FROM entries WHERE list_id = ?", (list_id,))
+    conn.execute("DELETE FROM lists WHERE id = ?", (list_id,))
+
+def get_meta(key, default=None):
+    row = connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return default if row is None else row[0]
+
+def set_meta(key, value):
+    connection().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+def list_names():
+    rows = connection().execute("SELECT name FROM lists WHERE name NOT LIKE ? ORDER BY name", (f"%{STAGING_MARK}%",))
+    return [name for (name,) in rows]
+
+def list_signature(name):
+    row = connection().execute("SELECT id, revision FROM lists WHERE name = ?", (name,)).fetchone()
+    return tuple(row) if row else None
+
+class SqliteWordList(Sequence):
+    def __init__(self, list_id, revision, ids):
+        self.list_id = list_id
+        self.revision = revision
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self.ids))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return connection().execute(
+                "SELECT word, meaning FROM entries WHERE list_id = ? AND id BETWEEN ? AND ? ORDER BY id",
+                (self.list_id, self.ids[start], self.ids[stop - 1])
+            ).fetchall()
+        row = connection().execute(
+            "SELECT word, meaning FROM entries WHERE id = ?", (self.ids[index],)
+        ).fetchone()
+        if row is None:
+            raise IndexError("word list entry was removed")
+        return row
+
+    def __iter__(self):
+        for start in range(0, len(self.ids), WRITE_BATCH):
+            yield from self[start:start + WRITE_BATCH]
+
+    def entry_id(self, index):
+        return self.ids[index]
+
+    def resident_size(self):
+        return 64 + self.ids.itemsize * len(self.ids)
+
+def open_list(name):
+    conn = connection()
+    row = conn.execute("SELECT id, revision FROM lists WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        return []
+    list_id, revision = row
+    ids = array("q", (entry_id for (entry_id,) in conn.execute(
+        "SELECT id FROM entries WHERE list_id = ? ORDER BY id", (list_id,)
+    )))
+    return SqliteWordList(list_id, revision, ids)
+
+def load_weights(name):
+    row = list_signature(name)
+    if row is None:
+        return array("d")
+    return array("d", (weight for (weight,) in connection().execute(
+        "SELECT weight FROM entries WHERE list_id = ? ORDER BY id", (row[0],)
+    )))
+
+def _bump_revision(conn, words):
+    # Returns the new revision, or None when someone else changed the list
+    # since `words` was read (the caller then has to reopen it)
+    previous = conn.execute("SELECT revision FROM lists WHERE id = ?", (words.list_id,)).fetchone()
+    conn.execute("UPDATE lists SET revision = revision + 1 WHERE id = ?", (words.list_id,))
+    if previous is None or previous[0] != words.revision:
+        return None
+    return words.revision + 1
+
+def _list_id(conn, name):
+    row = conn.execute("SELECT id FROM lists WHERE name = ?", (name,)).fetchone()
+    if row is not None:
+        return row[0]
+    return conn.execute("INSERT INTO lists (name) VALUES (?)", (name,)).lastrowid
+
+# Single-row edits. Each runs in its own transaction and returns the list
+# view with the change applied (None if it has to be reopened).
+
+def append_entry(words, name, word, meaning, weight=1.0):
+    conn = connection()
+    with transaction(conn):
+        list_id = words.list_id if isinstance(words, SqliteWordList) else _list_id(conn, name)
+        entry_id = conn.execute(
+            "INSERT INTO entries (list_id, word, meaning, weight, added_at) VALUES (?, ?, ?, ?, ?)",
+            (list_id, word, meaning, weight, time.time())
+        ).lastrowid
+        revision = _bump_revision(conn, words) if isinstance(words, SqliteWordList) else None
+    if revision is None:
+        return None
+    ids = array("q", words.ids)
+    ids.append(entry_id)
+    return SqliteWordList(words.list_id, revision, ids)
+
+def update_entry(words, index, word, meaning):
+    conn = connection()
+    with transaction(conn):
+        conn.execute("UPDATE entries SET word = ?, meaning = ? WHERE id = ?", (word, meaning, words.entry_id(index)))
+        revision = _bump_revision(conn, words)
+    if revision is None:
+        return None
+    return SqliteWordList(words.list_id, revision, words.ids)
+
+def delete_entry(words, index):
+    conn = connection()
+    with transaction(conn):
+        conn.execute("DELETE FROM entries WHERE id = ?", (words.entry_id(index),))
+        revision = _bump_revision(conn, words)
+    if revision is None:
+        return None
+    ids = array("q", words.ids)
+    del ids[index]
+    return SqliteWordList(words.list_id, revision, ids)
+
+def rename_list(old_name, new_name):
+    conn = connection()
+    with transaction(conn):
+        conn.execute("UPDATE lists SET name = ?, revision = revision + 1 WHERE name = ?", (new_name, old_name))
+
+def delete_list(name):
+    conn = connection()
+    with transaction(conn):
+        row = conn.execute("SELECT id FROM lists WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            _drop_list(conn, row[0])
+
+class ListWriter:
+    def __init__(self, conn, list_id):
+        self.conn = conn
+        self.list_id = list_id
+        self.pending = []
+
+    def add(self, word, meaning, weight=1.0):
+        self.pending.append((self.list_id, word, meaning, weight, time.time()))
+        if len(self.pending) >= WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with transaction(self.conn):
+                self.conn.executemany(
+                    "INSERT INTO entries (list_id, word, meaning, weight, added_at) VALUES (?, ?, ?, ?, ?)",
+                    self.pending
+                )
+            self.pending = []
+
+@contextmanager
+def list_writer(name):
+    # Fills a hidden staging list in batches, then swaps it in under `name`
+    # in one transaction; other readers and writers are never blocked for
+    # the whole import
+    conn = connection()
+    with transaction(conn):
+        staging_id = conn.execute(
+            "INSERT INTO lists (name) VALUES (?)", (name + STAGING_MARK + uuid.uuid4().hex,)
+        ).lastrowid
+    writer = ListWriter(conn, staging_id)
+    try:
+        yield writer
+        writer.flush()
+        with transaction(conn):
+            row = conn.execute("SELECT id, revision FROM lists WHERE name = ?", (name,)).fetchone()
+            revision = 0
+            if row is not None:
+                _drop_list(conn, row[0])
+                revision = row[1] + 1
+            conn.execute("UPDATE lists SET name = ?, revision = ? WHERE id = ?", (name, revision, staging_id))
+    except BaseException:
+        with transaction(conn):
+            _drop_list(conn, staging_id)
+        raise
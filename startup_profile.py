@@ -0,0 +1,46 @@
+import sys
+import time
+# Taken before anything else is imported so Qt's own import is counted too
+_started = time.perf_counter()
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+# Phase timings for `main.py --startup-profile`. Each mark() closes the phase
+# that started at the previous mark; the report is printed once the main
+# window has painted for the first time.
+ENABLED = "--startup-profile" in sys.argv
+
+_phases = []
+_last = _started
+
+def mark(phase):
+    global _last
+    if not ENABLED:
+        return
+    now = time.perf_counter()
+    _phases.append((phase, now - _last))
+    _last = now
+
+def report():
+    total = time.perf_counter() - _started
+    width = max(len(phase) for phase, _ in _phases)
+    print("Startup profile:")
+    for phase, seconds in _phases:
+        print(f"  {phase:<{width}}  {seconds * 1000:8.1f} ms")
+    print(f"  {'total':<{width}}  {total * 1000:8.1f} ms")
+    sys.stdout.flush()
+
+class _FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            # Runs after the paint event has been handled
+            QTimer.singleShot(0, self.painted)
+        return False
+
+    def painted(self):
+        mark("first paint")
+        report()
+
+def watch_first_paint(widget):
+    if ENABLED:
+        widget.installEventFilter(_FirstPaint(widget))
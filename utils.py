@@ -1,17 +1,45 @@
 import os
 import json
-import platform
-import ctypes
 import random
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from array import array
+from atomic_file import atomic_write, backup_path
+from word_format import parse_word_line, parse_weighted_line, format_word_line
+from compiled_list import (
+    COMPILED_EXTENSION, TAIL_LIMIT, CompiledWordList, AppendedWordList, open_compiled_word_list
+)
+from indexed_list import INDEX_EXTENSION, open_indexed_word_list
+from scheduler import SCHEDULE_EXTENSION
+from shuffle_cycle import CYCLE_EXTENSION
+from word_journal import (
+    JOURNAL_EXTENSION, JournaledWordList, read_journal, append_journal, journal_length
+)
 
 SETTINGS_FILE = "settings.json"
 DATA_FOLDER = "word_lists"
 FONTS_FOLDER = "fonts"
 ICON_FOLDER = "icon"
 
-os.makedirs(DATA_FOLDER, exist_ok=True)
-os.makedirs(FONTS_FOLDER, exist_ok=True)
-os.makedirs(ICON_FOLDER, exist_ok=True)
+WORD_CACHE_MAX_BYTES = 64 * 1024 * 1024
+WORD_LIST_FORMATS = ["compiled", "indexed", "text"]
+WORD_LIST_FORMAT = "compiled"
+# Where lists live: .txt files in DATA_FOLDER or one SQLite database
+WORD_STORAGES = ["files", "sqlite"]
+WORD_STORAGE = "files"
+DATABASE_FILE = os.path.join(DATA_FOLDER, "word_lists.db")
+# Files derived from a word list that live next to it in DATA_FOLDER
+FEEDBACK_EXTENSION = ".weights"
+WORD_LIST_COMPANIONS = [
+    COMPILED_EXTENSION, INDEX_EXTENSION, SCHEDULE_EXTENSION, FEEDBACK_EXTENSION, CYCLE_EXTENSION,
+    JOURNAL_EXTENSION
+]
+# Journaled edits/deletes kept before the list file is rewritten
+JOURNAL_COMPACT_OPS = 256
+
+# Loaded by set_word_storage the first time the database is used
+sqlite_store = None
 
 TRANSLATIONS = {
     "fa": {
@@ -41,6 +69,9 @@ TRANSLATIONS = {
         "edit_word_title": "ویرایش لغت",
         "edit_meaning_prompt": "معنی:",
         "delete_word_confirm": "آیا مطمئن هستید؟",
+        "word_column": "لغت",
+        "meaning_column": "معنی",
+        "search_placeholder": "جستجو در لغت‌ها و معنی‌ها...",
         "new_list_title": "لیست جدید",
         "new_list_prompt": "نام لیست:",
         "rename_list_title": "تغییر نام لیست",
@@ -52,6 +83,21 @@ TRANSLATIONS = {
         "import_list_replace": "لیستی با نام '{name}' وجود دارد. آیا می‌خواهید آن را جایگزین کنید؟",
         "import_list_invalid": "فایل انتخاب‌شده معتبر نیست. لطفاً فایلی با فرمت صحیح (word::meaning) انتخاب کنید.",
         "import_list_empty": "فایل انتخاب‌شده خالی است یا هیچ لغت معتبری ندارد。",
+        "import_list_progress": "در حال وارد کردن '{name}'... ({rejected} خط نامعتبر)",
+        "import_list_done": "{count} لغت وارد شد و {rejected} خط نامعتبر نادیده گرفته شد.",
+        "cancel_btn": "لغو",
+        "export_list_btn": "خروجی گرفتن از لیست",
+        "export_list_title": "ذخیره لیست به صورت فایل متنی",
+        "export_list_error": "ذخیره فایل ممکن نشد.",
+        "import_folder_btn": "وارد کردن پوشه",
+        "import_folder_title": "وارد کردن همه فایل‌های یک پوشه",
+        "import_folder_replace": "{count} لیست با همین نام وجود دارد. آیا می‌خواهید جایگزین شوند؟",
+        "import_folder_progress": "در حال وارد کردن {count} فایل...",
+        "import_folder_done": "{imported} لیست وارد شد، {failed} فایل وارد نشد.",
+        "duplicate_policy_title": "لغت‌های تکراری",
+        "duplicate_policy_prompt": "با لغت‌های تکراری چه شود؟",
+        "duplicate_policy_options": ["نادیده گرفتن", "جایگزینی معنی", "افزودن به معنی قبلی"],
+        "duplicate_word": "'{word}' از قبل در این لیست وجود دارد.",
         "select_list_title": "انتخاب لیست",
         "select_list_prompt": "یک لیست را انتخاب کنید:",
         "no_lists_found": "هیچ لیستی یافت نشد。",
@@ -87,9 +133,14 @@ TRANSLATIONS = {
         "save_btn": "ذخیره تنظیمات",
         "language_select": "انتخاب زبان",
         "language_options": ["فارسی", "انگلیسی"],
+        "render_mode": "نحوه نمایش حباب‌ها",
+        "render_mode_options": ["پنجره جداگانه برای هر حباب", "یک لایه برای همه حباب‌ها"],
+        "bubble_screen": "نمایشگر حباب‌ها",
+        "bubble_screen_options": ["نمایشگر اصلی", "همه نمایشگرها (چرخشی)"],
+        "screen_number": "نمایشگر {number}",
         "play_mode_title": "نحوه پخش",
         "play_mode_prompt": "نحوه پخش را انتخاب کنید:",
-        "play_mode_options": ["پخش پشت سر هم", "پخش رندوم"],
+        "play_mode_options": ["پخش پشت سر هم", "پخش رندوم", "مرور هوشمند (لایتنر)", "پخش رندوم وزن‌دار", "پخش رندوم بدون تکرار"],
         "seconds": "{value} ثانیه",
         "preview_word": "پیش‌نمایش",
         "preview_meaning": "نمایش آزمایشی",
@@ -122,6 +173,9 @@ TRANSLATIONS = {
         "edit_word_title": "Edit Word",
         "edit_meaning_prompt": "Meaning:",
         "delete_word_confirm": "Are you sure?",
+        "word_column": "Word",
+        "meaning_column": "Meaning",
+        "search_placeholder": "Search words and meanings...",
         "new_list_title": "New List",
         "new_list_prompt": "List name:",
         "rename_list_title": "Rename List",
@@ -133,6 +187,21 @@ TRANSLATIONS = {
         "import_list_replace": "A list named '{name}' already exists. Do you want to replace it?",
         "import_list_invalid": "The selected file is invalid. Please select a file with the correct format (word::meaning).",
         "import_list_empty": "The selected file is empty or contains no valid words.",
+        "import_list_progress": "Importing '{name}'... ({rejected} invalid lines)",
+        "import_list_done": "Imported {count} words; {rejected} invalid lines were skipped.",
+        "cancel_btn": "Cancel",
+        "export_list_btn": "Export List",
+        "export_list_title": "Save List as Text File",
+        "export_list_error": "The file could not be saved.",
+        "import_folder_btn": "Import Folder",
+        "import_folder_title": "Import All Files in a Folder",
+        "import_folder_replace": "{count} lists with the same names already exist. Do you want to replace them?",
+        "import_folder_progress": "Importing {count} files...",
+        "import_folder_done": "{imported} lists imported, {failed} files failed.",
+        "duplicate_policy_title": "Duplicate Words",
+        "duplicate_policy_prompt": "What should happen to duplicate words?",
+        "duplicate_policy_options": ["Skip", "Replace Meaning", "Concatenate Meanings"],
+        "duplicate_word": "'{word}' is already in this list.",
         "select_list_title": "Select List",
         "select_list_prompt": "Choose list:",
         "no_lists_found": "No lists found.",
@@ -168,9 +237,14 @@ TRANSLATIONS = {
         "save_btn": "Save Settings",
         "language_select": "Select Language",
         "language_options": ["Persian", "English"],
+        "render_mode": "Bubble Rendering",
+        "render_mode_options": ["Separate Windows", "Single Overlay"],
+        "bubble_screen": "Bubble Screen",
+        "bubble_screen_options": ["Primary Screen", "All Screens (rotate)"],
+        "screen_number": "Screen {number}",
         "play_mode_title": "Play Mode",
         "play_mode_prompt": "Select play mode:",
-        "play_mode_options": ["Sequential", "Random"],
+        "play_mode_options": ["Sequential", "Random", "Spaced Repetition", "Weighted Random", "Shuffled Cycle"],
         "seconds": "{value} seconds",
         "preview_word": "Preview",
         "preview_meaning": "Test Display",
@@ -178,6 +252,12 @@ TRANSLATIONS = {
     }
 }
 
+def ensure_data_folders():
+    # Called once at startup rather than on import, so helper processes and
+    # tools that only import utils do not touch the file system
+    for folder in (DATA_FOLDER, FONTS_FOLDER, ICON_FOLDER):
+        os.makedirs(folder, exist_ok=True)
+
 def load_settings():
     default_settings = {
         "selected_file": "",
@@ -194,46 +274,433 @@ def load_settings():
         "language": "fa",
         "play_mode": "random",
         "bubble_position": "random",
-        "dark_mode": False
+        "dark_mode": False,
+        "render_mode": "windows",
+        "bubble_screen": "primary",
+        "duplicate_policy": "skip",
+        "word_cache_mb": 64,
+        "word_list_format": "compiled",
+        "word_storage": "files",
+        "bubble_pool_size": 4,
+        "pixmap_cache_mb": 32,
+        "max_fps": 60
     }
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                loaded_settings = json.load(f)
-                default_settings.update(loaded_settings)
-        except Exception:
-            pass
+    # A damaged or missing settings file falls back to the previous good copy
+    for path in (SETTINGS_FILE, backup_path(SETTINGS_FILE)):
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    loaded_settings = json.load(f)
+                    default_settings.update(loaded_settings)
+                break
+            except Exception:
+                pass
     return default_settings
 
+def dump_settings(settings):
+    return json.dumps(settings, ensure_ascii=False, indent=4)
+
+def write_settings_text(text):
+    with atomic_write(SETTINGS_FILE, backup=True) as f:
+        f.write(text)
+
 def save_settings(settings):
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-        json.dump(settings, f, ensure_ascii=False, indent=4)
+    write_settings_text(dump_settings(settings))
 
-def list_word_files():
+def set_word_storage(storage, migrate=False):
+    # migrate is for the GUI process only: leftovers of unfinished imports
+    # are dropped and a new database is filled from the existing .txt lists
+    # (the files themselves are left in place)
+    global WORD_STORAGE, sqlite_store
+    if storage not in WORD_STORAGES:
+        storage = "files"
+    if storage == "sqlite":
+        import sqlite_store
+        sqlite_store.open_store(DATABASE_FILE)
+        if migrate:
+            sqlite_store.drop_staging_lists()
+        # Only ever once per database, so deleting every list later does not
+        # bring the old text lists back (a database that already has lists
+        # was filled before this was recorded)
+        if migrate and not sqlite_store.get_meta("migrated_text_lists"):
+            if not sqlite_store.list_names():
+                for file_name in _text_list_files():
+                    with sqlite_store.list_writer(file_name) as writer:
+                        for entry in load_words_from_file(file_name, with_weights=True):
+                            writer.add(*entry)
+            sqlite_store.set_meta("migrated_text_lists", 1)
+    WORD_STORAGE = storage
+    invalidate_word_cache()
+
+def _text_list_files():
+    if _catalog is not None:
+        return _catalog.word_files()
+    return scan_word_files()
+
+def scan_word_files():
     return [f for f in os.listdir(DATA_FOLDER) if f.endswith(".txt")]
 
-def load_words_from_file(file_name):
+# Optional in-memory listing of DATA_FOLDER/FONTS_FOLDER kept current by
+# file-change notifications (see file_catalog). While one is installed,
+# listings come from it and cached lists are trusted until it reports a
+# change, instead of stat-ing the list file on every get_words call.
+_catalog = None
+
+def set_file_catalog(catalog):
+    global _catalog
+    _catalog = catalog
+
+def _list_file_written(file_name):
+    # Tells the catalog this change is the app's own, not another program's
+    if _catalog is not None:
+        _catalog.list_written(file_name)
+
+def list_word_files():
+    if WORD_STORAGE == "sqlite":
+        return sqlite_store.list_names()
+    return _text_list_files()
+
+def load_words_from_file(file_name, with_weights=False):
     words = []
+    parse = parse_weighted_line if with_weights else parse_word_line
     file_path = os.path.join(DATA_FOLDER, file_name)
     if os.path.exists(file_path):
         with open(file_path, "r", encoding="utf-8") as f:
             for line in f:
-                line = line.strip()
-                if line and "::" in line:
-                    word, meaning = line.split("::", 1)
-                    word = word.strip()
-                    meaning = meaning.strip()
-                    if word and meaning:
-                        words.append((word, meaning))
+                entry = parse(line)
+                if entry:
+                    words.append(entry)
     return words
 
 def save_words_to_file(file_name, words):
+    # Entries are (word, meaning) or (word, meaning, weight)
+    with word_list_writer(file_name) as writer:
+        for entry in words:
+            writer.add(*entry)
+    invalidate_word_cache(file_name)
+
+class _TextListWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def add(self, word, meaning, weight=1.0):
+        self.f.write(format_word_line(word, meaning, weight))
+
+@contextmanager
+def word_list_writer(file_name):
+    # Streams a complete replacement for a list through writer.add(word,
+    # meaning, weight). Readers keep seeing the old list until the block
+    # exits cleanly; an exception leaves it untouched. Safe to use from a
+    # worker thread (the word cache notices the new list by its signature).
+    if WORD_STORAGE == "sqlite":
+        with sqlite_store.list_writer(file_name) as writer:
+            yield writer
+        return
+    with atomic_write(os.path.join(DATA_FOLDER, file_name)) as f:
+        yield _TextListWriter(f)
+    _list_file_written(file_name)
+    journal_path = word_list_sidecar(file_name, JOURNAL_EXTENSION)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+def export_word_list(file_name, path):
+    # Writes any list, whatever the storage, as a word::meaning text file
+    words = get_words(file_name)
+    weights = load_word_weights(file_name)
+    with atomic_write(path) as f:
+        for index, (word, meaning) in enumerate(words):
+            f.write(format_word_line(word, meaning, weights[index] if index < len(weights) else 1.0))
+
+def append_word(file_name, word, meaning):
+    # Adds go straight to the end of the list file; nothing before it moves
+    if WORD_STORAGE == "sqlite":
+        _store_edit(file_name, lambda words: sqlite_store.append_entry(words, file_name, word, meaning))
+        return
+    cached = _word_cache.get(file_name)
+    cached_is_current = cached is not None and cached[0] == _list_signature(file_name)
+    file_path = os.path.join(DATA_FOLDER, file_name)
+    needs_newline = False
+    if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        with open(file_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    with open(file_path, "a", encoding="utf-8") as f:
+        if needs_newline:
+            f.write("\n")
+        f.write(format_word_line(word, meaning))
+    _list_file_written(file_name)
+    invalidate_word_cache(file_name)
+    # A compiled list that was current just gains the entry in memory, so
+    # the add does not cost a pass over the whole file
+    entry = parse_word_line(format_word_line(word, meaning))
+    if cached_is_current and entry is not None:
+        words = _with_appended(cached[1], entry)
+        if words is not None:
+            _cache_words(file_name, _list_signature(file_name), words, cached[2] + 256)
+
+def _with_appended(words, entry):
+    if isinstance(words, JournaledWordList):
+        base = _with_appended(words.base, entry)
+        return None if base is None else JournaledWordList(base, words.deleted, words.edits)
+    if isinstance(words, CompiledWordList):
+        return AppendedWordList(words, [entry])
+    if isinstance(words, AppendedWordList) and len(words.tail) < TAIL_LIMIT:
+        return AppendedWordList(words.base, words.tail + [entry])
+    return None
+
+def _journal_base_index(file_name, index):
+    words = get_words(file_name)
+    if isinstance(words, JournaledWordList):
+        return words.base_index(index)
+    return index
+
+def update_word_entry(file_name, index, word, meaning):
+    # index is the entry's position as returned by get_words. Text lists
+    # record the change in the journal; the database updates one row.
+    if WORD_STORAGE == "sqlite":
+        _store_edit(file_name, lambda words: sqlite_store.update_entry(words, index, word, meaning))
+        return
+    base_index = _journal_base_index(file_name, index)
+    _append_journal_op(file_name, {"op": "edit", "index": base_index, "word": word, "meaning": meaning})
+
+def delete_word_entry(file_name, index):
+    if WORD_STORAGE == "sqlite":
+        _store_edit(file_name, lambda words: sqlite_store.delete_entry(words, index))
+        return
+    base_index = _journal_base_index(file_name, index)
+    _append_journal_op(file_name, {"op": "delete", "index": base_index})
+
+def _store_edit(file_name, edit):
+    # The edited view replaces the cached one, so the next get_words does
+    # not have to reread the whole id list
+    words = edit(get_words(file_name))
+    invalidate_word_cache(file_name)
+    if words is not None:
+        _cache_words(file_name, (words.list_id, words.revision), words, _estimate_words_size(words))
+
+def _cache_words(file_name, signature, words, size):
+    global _word_cache_bytes
+    _word_cache[file_name] = (signature, words, size)
+    _word_cache_bytes += size
+    _evict_word_cache(keep=file_name)
+
+def _append_journal_op(file_name, op):
+    journal_path = word_list_sidecar(file_name, JOURNAL_EXTENSION)
+    append_journal(journal_path, op)
+    invalidate_word_cache(file_name)
+    if journal_length(journal_path) >= JOURNAL_COMPACT_OPS:
+        compact_word_file(file_name)
+
+def compact_word_file(file_name):
+    # Folds the journal back into the list file with a single rewrite
+    if WORD_STORAGE == "sqlite":
+        return
+    journal_path = word_list_sidecar(file_name, JOURNAL_EXTENSION)
+    if not os.path.exists(journal_path):
+        return
+    deleted, edits = read_journal(journal_path)
+    words = load_words_from_file(file_name, with_weights=True)
+    for index, (word, meaning) in edits.items():
+        if index < len(words):
+            words[index] = (word, meaning, words[index][2])
+    for index in reversed(deleted):
+        if index < len(words):
+            words.pop(index)
+    save_words_to_file(file_name, words)
+
+_weight_cache = {}
+
+def load_word_weights(file_name):
+    # Per-entry weights from the optional third field, in list order
     file_path = os.path.join(DATA_FOLDER, file_name)
-    with open(file_path, "w", encoding="utf-8") as f:
-        for word, meaning in words:
-            f.write(f"{word}::{meaning}\n")
+    signature = _list_signature(file_name)
+    cached = _weight_cache.get(file_name)
+    if cached and cached[0] == signature:
+        return cached[1]
+    weights = array("d")
+    if WORD_STORAGE == "sqlite":
+        weights = sqlite_store.load_weights(file_name)
+    elif signature is not None:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = parse_weighted_line(line)
+                if entry:
+                    weights.append(entry[2])
+        deleted, _ = read_journal(word_list_sidecar(file_name, JOURNAL_EXTENSION))
+        for index in reversed(deleted):
+            if index < len(weights):
+                del weights[index]
+    _weight_cache.clear()
+    _weight_cache[file_name] = (signature, weights)
+    return weights
+
+def load_feedback_weights(file_name):
+    path = word_list_sidecar(file_name, FEEDBACK_EXTENSION)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {int(index): float(weight) for index, weight in json.load(f).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def save_feedback_weights(file_name, weights):
+    path = word_list_sidecar(file_name, FEEDBACK_EXTENSION)
+    with atomic_write(path) as f:
+        json.dump({str(index): weight for index, weight in weights.items()}, f)
+
+# Parsed word lists keyed by file name. Each entry remembers the (mtime, size)
+# of the file it was parsed from so edits made outside the app are picked up.
+_word_cache = OrderedDict()
+_word_cache_bytes = 0
+
+def _file_signature(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _list_signature(file_name):
+    # The list file plus its pending journal, if any
+    if WORD_STORAGE == "sqlite":
+        return sqlite_store.list_signature(file_name)
+    list_signature = _file_signature(os.path.join(DATA_FOLDER, file_name))
+    if list_signature is None:
+        return None
+    return (list_signature, _file_signature(word_list_sidecar(file_name, JOURNAL_EXTENSION)))
+
+def _estimate_words_size(words):
+    if hasattr(words, "resident_size"):
+        return words.resident_size()
+    size = sys.getsizeof(words)
+    for word, meaning in words:
+        size += 56 + sys.getsizeof(word) + sys.getsizeof(meaning)
+    return size
+
+def set_word_cache_limit(max_bytes):
+    global WORD_CACHE_MAX_BYTES
+    WORD_CACHE_MAX_BYTES = max(0, int(max_bytes))
+    _evict_word_cache()
+
+def _evict_word_cache(keep=None):
+    global _word_cache_bytes
+    while _word_cache_bytes > WORD_CACHE_MAX_BYTES and _word_cache:
+        file_name = next(iter(_word_cache))
+        if file_name == keep:
+            if len(_word_cache) == 1:
+                break
+            _word_cache.move_to_end(file_name)
+            continue
+        _, _, size = _word_cache.pop(file_name)
+        _word_cache_bytes -= size
+
+def set_word_list_format(list_format):
+    global WORD_LIST_FORMAT
+    if list_format not in WORD_LIST_FORMATS:
+        list_format = "compiled"
+    if list_format != WORD_LIST_FORMAT:
+        WORD_LIST_FORMAT = list_format
+        invalidate_word_cache()
+
+def invalidate_word_cache(file_name=None):
+    global _word_cache_bytes
+    if file_name is None:
+        _word_cache.clear()
+        _word_cache_bytes = 0
+    elif file_name in _word_cache:
+        _, _, size = _word_cache.pop(file_name)
+        _word_cache_bytes -= size
+
+def _open_words(file_name, signature):
+    if WORD_LIST_FORMAT == "compiled":
+        try:
+            return open_compiled_word_list(
+                os.path.join(DATA_FOLDER, file_name), signature,
+                lambda: load_words_from_file(file_name)
+            )
+        except (OSError, ValueError):
+            pass
+    elif WORD_LIST_FORMAT == "indexed":
+        try:
+            return open_indexed_word_list(os.path.join(DATA_FOLDER, file_name), signature)
+        except (OSError, ValueError):
+            pass
+    return load_words_from_file(file_name)
+
+def word_list_sidecar(file_name, extension):
+    return os.path.join(DATA_FOLDER, os.path.splitext(file_name)[0] + extension)
+
+def _companion_paths(file_name):
+    base = os.path.join(DATA_FOLDER, os.path.splitext(file_name)[0])
+    return [base + ext for ext in WORD_LIST_COMPANIONS]
+
+def rename_word_file(old_name, new_name):
+    invalidate_word_cache(old_name)
+    if WORD_STORAGE == "sqlite":
+        sqlite_store.rename_list(old_name, new_name)
+    else:
+        os.rename(os.path.join(DATA_FOLDER, old_name), os.path.join(DATA_FOLDER, new_name))
+        _list_file_written(new_name)
+    for old_path, new_path in zip(_companion_paths(old_name), _companion_paths(new_name)):
+        if os.path.exists(old_path):
+            try:
+                os.replace(old_path, new_path)
+            except OSError:
+                pass
+
+def delete_word_file(file_name):
+    invalidate_word_cache(file_name)
+    if WORD_STORAGE == "sqlite":
+        sqlite_store.delete_list(file_name)
+    else:
+        os.remove(os.path.join(DATA_FOLDER, file_name))
+    for path in _companion_paths(file_name):
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def get_words(file_name):
+    # Shared, read-only view of a word list. Callers that want to modify the
+    # list must copy it first (or use load_words_from_file).
+    global _word_cache_bytes
+    if not file_name:
+        return []
+    cached = _word_cache.get(file_name)
+    if cached and WORD_STORAGE == "files" and _catalog is not None and _catalog.is_watching(file_name):
+        _word_cache.move_to_end(file_name)
+        return cached[1]
+    signature = _list_signature(file_name)
+    if signature is None:
+        invalidate_word_cache(file_name)
+        return []
+    cached = _word_cache.get(file_name)
+    if cached and cached[0] == signature:
+        _word_cache.move_to_end(file_name)
+        return cached[1]
+    invalidate_word_cache(file_name)
+    if WORD_STORAGE == "sqlite":
+        words = sqlite_store.open_list(file_name)
+        list_signature, journal_signature = signature, None
+    else:
+        list_signature, journal_signature = signature
+        words = _open_words(file_name, list_signature)
+    size = _estimate_words_size(words)
+    if journal_signature is not None:
+        deleted, edits = read_journal(word_list_sidecar(file_name, JOURNAL_EXTENSION))
+        words = JournaledWordList(words, deleted, edits)
+        size += journal_signature[1]
+    _word_cache[file_name] = (signature, words, size)
+    _word_cache_bytes += size
+    _evict_word_cache(keep=file_name)
+    return words
 
 def list_font_files():
+    if _catalog is not None:
+        return _catalog.font_files()
+    return scan_font_files()
+
+def scan_font_files():
     return [f for f in os.listdir(FONTS_FOLDER) if f.lower().endswith((".ttf", ".otf"))]
 
 def is_rtl(text):
@@ -243,7 +710,8 @@ def is_rtl(text):
     return ord(first_char) >= 0x0600 and ord(first_char) <= 0x06FF
 
 def set_window_title_bar_theme(window, dark_mode):
-    if platform.system() == "Windows":
+    if sys.platform == "win32":
+        import ctypes
         try:
             hwnd = window.winId().__int__()
             DWMWA_USE_IMMERSIVE_DARK_MODE = 20
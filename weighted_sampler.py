@@ -0,0 +1,76 @@
+import random
+from array import array
+from bisect import bisect_right
+
+# Walker/Vose alias table: O(n) to build, O(1) per draw. Weight changes are
+# kept in a small override table and applied by rejection, so an update does
+# not rebuild the table until enough overrides have piled up.
+MAX_OVERRIDES = 256
+
+class AliasSampler:
+    def __init__(self, weights, rng=None):
+        self.rng = rng or random.Random()
+        self._build([max(0.0, float(w)) for w in weights])
+
+    def _build(self, weights):
+        n = len(weights)
+        self.weights = array("d", weights)
+        self.prob = array("d", [0.0]) * n
+        self.alias = array("L", [0]) * n
+        self.total = sum(weights)
+        self.overrides = {}
+        self.removed = 0.0
+        self._override_keys = []
+        self._override_sums = []
+        if n == 0 or self.total <= 0:
+            return
+        scaled = [w * n / self.total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.weights)
+
+    def weight(self, index):
+        return self.overrides.get(index, self.weights[index])
+
+    def update(self, index, weight):
+        weight = max(0.0, float(weight))
+        if index not in self.overrides:
+            self.removed += self.weights[index]
+        self.overrides[index] = weight
+        if len(self.overrides) > MAX_OVERRIDES or self.removed > self.total / 2:
+            self._build([self.weight(i) for i in range(len(self.weights))])
+            return
+        self._override_keys = list(self.overrides)
+        self._override_sums = []
+        running = 0.0
+        for key in self._override_keys:
+            running += self.overrides[key]
+            self._override_sums.append(running)
+
+    def sample(self):
+        n = len(self.weights)
+        if n == 0:
+            raise IndexError("cannot sample from an empty list")
+        override_total = self._override_sums[-1] if self._override_sums else 0.0
+        base_total = self.total - self.removed
+        if base_total <= 0 and override_total <= 0:
+            return self.rng.randrange(n)
+        if self.rng.random() * (base_total + override_total) < override_total:
+            position = bisect_right(self._override_sums, self.rng.random() * override_total)
+            return self._override_keys[min(position, len(self._override_keys) - 1)]
+        while True:
+            column = self.rng.randrange(n)
+            index = column if self.rng.random() < self.prob[column] else self.alias[column]
+            if index not in self.overrides:
+                return index
@@ -0,0 +1,45 @@
+import math
+
+def parse_weighted_line(line):
+    # word::meaning with an optional trailing ::weight (a positive number)
+    line = line.strip()
+    if line and "::" in line:
+        word, meaning = line.split("::", 1)
+        weight = 1.0
+        if "::" in meaning:
+            rest, last = meaning.rsplit("::", 1)
+            try:
+                value = float(last)
+            except ValueError:
+                value = None
+            if value is not None and value > 0 and math.isfinite(value):
+                meaning, weight = rest, value
+        word = word.strip()
+        meaning = meaning.strip()
+        if word and meaning:
+            return word, meaning, weight
+    return None
+
+def parse_word_line(line):
+    entry = parse_weighted_line(line)
+    return entry[:2] if entry else None
+
+def format_word_line(word, meaning, weight=1.0):
+    if weight != 1.0:
+        return f"{word}::{meaning}::{weight:g}\n"
+    return f"{word}::{meaning}\n"
+
+def make_entry(word, meaning, weight=1.0):
+    # Cleans fields coming from other formats so they survive a round trip
+    # through a word::meaning line
+    word = " ".join(str(word).split()).replace("::", ":")
+    meaning = " ".join(str(meaning).split())
+    try:
+        weight = float(weight)
+    except (TypeError, ValueError):
+        weight = 1.0
+    if not (weight > 0 and math.isfinite(weight)):
+        weight = 1.0
+    if word and meaning:
+        return word, meaning, weight
+    return None
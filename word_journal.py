@@ -0,0 +1,73 @@
+import json
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+
+# Pending edits and deletes for a word list (.journal), one JSON object per
+# line. Indices are positions in the list file as it is on disk; adds are
+# appended to the list file itself, so they never need a journal entry.
+JOURNAL_EXTENSION = ".journal"
+
+def read_journal(path):
+    deleted = []
+    edits = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                    index = int(op["index"])
+                    if op["op"] == "delete":
+                        edits.pop(index, None)
+                        position = bisect_left(deleted, index)
+                        if position == len(deleted) or deleted[position] != index:
+                            deleted.insert(position, index)
+                    elif op["op"] == "edit":
+                        edits[index] = (op["word"], op["meaning"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        pass
+    return deleted, edits
+
+def append_journal(path, op):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(op, ensure_ascii=False) + "\n")
+
+def journal_length(path):
+    try:
+        with open(path, "rb") as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 0
+
+class JournaledWordList(Sequence):
+    # Read-only view of a base word list with journaled edits and deletes
+    # applied; lookups map a visible index to a base index in O(log d).
+    def __init__(self, base, deleted, edits):
+        self.base = base
+        self.deleted = [index for index in deleted if index < len(base)]
+        self.edits = edits
+
+    def base_index(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word list index out of range")
+        base_index = index
+        while True:
+            shifted = index + bisect_right(self.deleted, base_index)
+            if shifted == base_index:
+                return base_index
+            base_index = shifted
+
+    def __len__(self):
+        return len(self.base) - len(self.deleted)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        base_index = self.base_index(index)
+        if base_index in self.edits:
+            return self.edits[base_index]
+        return self.base[base_index]
+
@@ -1,16 +1,24 @@
 import os
+import time
 from PyQt5.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QListWidget, 
-    QMessageBox, QFileDialog, QApplication
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QTableView,
+    QHeaderView, QAbstractItemView, QLineEdit, QProgressDialog, QMessageBox, QFileDialog, QApplication
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThreadPool, QTimer
 from PyQt5.QtGui import QFont
 from custom_input_dialog import CustomInputDialog
+from word_table_model import WordTableModel
+from list_importer import ListImportTask, FolderImportTask
+from importers import supported_extensions, folder_import_files
+from dedup_index import DUPLICATE_POLICIES, DedupIndex, merge_meanings
 from utils import (
-    TRANSLATIONS, list_word_files, load_words_from_file, save_words_to_file, 
-    set_window_title_bar_theme
+    TRANSLATIONS, list_word_files, get_words, save_words_to_file, append_word,
+    update_word_entry, delete_word_entry, compact_word_file, export_word_list, rename_word_file, delete_word_file,
+    invalidate_word_cache, set_window_title_bar_theme
 )
 
+DEDUP_SLICE = 0.008
+
 class WordListManager(QDialog):
     def __init__(self, parent):
         super().__init__(parent)
@@ -21,17 +29,46 @@ class WordListManager(QDialog):
         self.setMinimumSize(600, 400)
         self.init_ui()
         self.update_theme()
+        self.file_catalog = parent.file_catalog
+        self.file_catalog.lists_changed.connect(self.refresh_lists)
+        self.file_catalog.list_modified.connect(self.list_modified)
 
     def init_ui(self):
         self.list_combo = QComboBox()
         self.list_combo.addItems(list_word_files())
         self.list_combo.currentTextChanged.connect(self.load_words)
+        self.loaded_file = ""
+        self.dedup_index = None
+        self.dedup_timer = QTimer(self)
+        self.dedup_timer.setInterval(0)
+        self.dedup_timer.timeout.connect(self.dedup_step)
+        self.import_task = None
+        self.import_progress = None
+        self.import_name = ""
         font = QFont(QApplication.font())
         font.setPointSize(font.pointSize() + 2)
         self.list_combo.setFont(font)
 
-        self.words_list = QListWidget()
-        self.words_list.setFont(font)
+        self.search_edit = QLineEdit()
+        self.search_edit.setFont(font)
+        self.search_edit.setPlaceholderText(self.trans["search_placeholder"])
+        self.search_edit.setClearButtonEnabled(True)
+
+        self.words_model = WordTableModel([self.trans["word_column"], self.trans["meaning_column"]], self)
+        self.words_table = QTableView()
+        self.words_table.setFont(font)
+        self.words_table.setModel(self.words_model)
+        self.words_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.words_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.words_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.words_table.setWordWrap(False)
+        self.words_table.verticalHeader().hide()
+        # Fixed row heights let the view skip measuring rows it does not show
+        self.words_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.words_table.verticalHeader().setDefaultSectionSize(self.words_table.fontMetrics().height() + 8)
+        self.words_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.words_table.doubleClicked.connect(self.edit_word)
+        self.search_edit.textChanged.connect(self.words_model.set_search)
         self.load_words(self.list_combo.currentText())
 
         self.add_word_btn = QPushButton(self.trans["add_word_btn"])
@@ -55,6 +92,12 @@ class WordListManager(QDialog):
         self.import_list_btn = QPushButton(self.trans["import_list_btn"])
         self.import_list_btn.clicked.connect(self.import_list)
 
+        self.import_folder_btn = QPushButton(self.trans["import_folder_btn"])
+        self.import_folder_btn.clicked.connect(self.import_folder)
+
+        self.export_list_btn = QPushButton(self.trans["export_list_btn"])
+        self.export_list_btn.clicked.connect(self.export_list)
+
         btn_layout = QVBoxLayout()
         btn_layout.addWidget(self.add_word_btn)
         btn_layout.addWidget(self.edit_word_btn)
@@ -64,11 +107,14 @@ class WordListManager(QDialog):
         btn_layout.addWidget(self.rename_list_btn)
         btn_layout.addWidget(self.delete_list_btn)
         btn_layout.addWidget(self.import_list_btn)
+        btn_layout.addWidget(self.import_folder_btn)
+        btn_layout.addWidget(self.export_list_btn)
         btn_layout.addStretch()
 
         list_layout = QVBoxLayout()
         list_layout.addWidget(self.list_combo)
-        list_layout.addWidget(self.words_list)
+        list_layout.addWidget(self.search_edit)
+        list_layout.addWidget(self.words_table)
 
         main_layout = QHBoxLayout()
         main_layout.addLayout(list_layout, 3)
@@ -92,10 +138,17 @@ class WordListManager(QDialog):
                 QPushButton:hover { 
                     background-color: #555555; 
                 }
-                QListWidget { 
+                QTableView { 
                     background-color: #3A3A3A; 
                     color: #FFFFFF; 
                     border: 1px solid #555555; 
+                    gridline-color: #555555;
+                }
+                QHeaderView::section { 
+                    background-color: #4A4A4A; 
+                    color: #FFFFFF; 
+                    border: 1px solid #555555; 
+                    padding: 4px; 
                 }
                 QComboBox { 
                     background-color: #4A4A4A; 
@@ -103,6 +156,12 @@ class WordListManager(QDialog):
                     border: 1px solid #555555; 
                     padding: 5px; 
                 }
+                QLineEdit { 
+                    background-color: #4A4A4A; 
+                    color: #FFFFFF; 
+                    border: 1px solid #555555; 
+                    padding: 5px; 
+                }
                 QComboBox::drop-down { 
                     width: 20px; 
                     border-left: 1px solid #555555; 
@@ -129,10 +188,17 @@ class WordListManager(QDialog):
                 QPushButton:hover { 
                     background-color: #CCCCCC; 
                 }
-                QListWidget { 
+                QTableView { 
                     background-color: #FFFFFF; 
                     color: #000000; 
                     border: 1px solid #AAAAAA; 
+                    gridline-color: #DDDDDD;
+                }
+                QHeaderView::section { 
+                    background-color: #E0E0E0; 
+                    color: #000000; 
+                    border: 1px solid #AAAAAA; 
+                    padding: 4px; 
                 }
                 QComboBox { 
                     background-color: #FFFFFF; 
@@ -140,6 +206,12 @@ class WordListManager(QDialog):
                     border: 1px solid #AAAAAA; 
                     padding: 5px; 
                 }
+                QLineEdit { 
+                    background-color: #FFFFFF; 
+                    color: #000000; 
+                    border: 1px solid #AAAAAA; 
+                    padding: 5px; 
+                }
                 QComboBox::drop-down { 
                     width: 20px; 
                     border-left: 1px solid #AAAAAA; 
@@ -153,11 +225,67 @@ class WordListManager(QDialog):
         set_window_title_bar_theme(self, self.dark_mode)
 
     def load_words(self, file_name):
-        self.words_list.clear()
-        if file_name:
-            words = load_words_from_file(file_name)
-            for word, meaning in words:
-                self.words_list.addItem(f"{word} :: {meaning}")
+        # Switching lists is a good moment to fold the previous list's journal
+        if self.loaded_file and self.loaded_file != file_name and self.loaded_file in list_word_files():
+            compact_word_file(self.loaded_file)
+        self.loaded_file = file_name
+        self.words_model.set_words(get_words(file_name) if file_name else [])
+        # Indexed in the background, a slice per event-loop pass, so it is
+        # usually ready by the time a word is added
+        self.dedup_index = DedupIndex(self.words_model.words)
+        self.dedup_timer.start()
+
+    def dedup_step(self):
+        deadline = time.perf_counter() + DEDUP_SLICE
+        while not self.dedup_index.is_complete() and time.perf_counter() < deadline:
+            self.dedup_index.build_chunk()
+        if self.dedup_index.is_complete():
+            self.dedup_timer.stop()
+
+    def refresh_lists(self):
+        # Lists added, renamed or removed outside the manager
+        names = list_word_files()
+        if names == [self.list_combo.itemText(i) for i in range(self.list_combo.count())]:
+            return
+        current = self.list_combo.currentText()
+        self.list_combo.blockSignals(True)
+        self.list_combo.clear()
+        self.list_combo.addItems(names)
+        self.list_combo.setCurrentText(current)
+        self.list_combo.blockSignals(False)
+        if self.list_combo.currentText() != self.loaded_file:
+            self.load_words(self.list_combo.currentText())
+
+    def list_modified(self, file_name):
+        if file_name == self.loaded_file:
+            self.load_words(file_name)
+
+    def get_dedup_index(self):
+        # Finishes the background build first if it is still running
+        if not self.dedup_index.is_complete():
+            self.dedup_index.build()
+            self.dedup_timer.stop()
+        return self.dedup_index
+
+    def ask_duplicate(self, word):
+        box = QMessageBox(self)
+        box.setWindowTitle(self.trans["duplicate_policy_title"])
+        box.setText(self.trans["duplicate_word"].format(word=word))
+        options = self.trans["duplicate_policy_options"]
+        replace_btn = box.addButton(options[1], QMessageBox.AcceptRole)
+        concatenate_btn = box.addButton(options[2], QMessageBox.AcceptRole)
+        box.addButton(options[0], QMessageBox.RejectRole)
+        box.exec_()
+        if box.clickedButton() == replace_btn:
+            return "replace"
+        if box.clickedButton() == concatenate_btn:
+            return "concatenate"
+        return None
+
+    def current_row(self):
+        # Row in the word list (not in the possibly filtered view)
+        index = self.words_table.currentIndex()
+        return self.words_model.source_row(index.row()) if index.isValid() else -1
 
     def add_word(self):
         if not self.list_combo.currentText():
@@ -172,16 +300,30 @@ class WordListManager(QDialog):
         if dialog.exec_():
             word, meaning = dialog.get_inputs()
             if word and meaning:
-                words = load_words_from_file(self.list_combo.currentText())
-                words.append((word, meaning))
-                save_words_to_file(self.list_combo.currentText(), words)
-                self.load_words(self.list_combo.currentText())
+                file_name = self.list_combo.currentText()
+                dedup_index = self.get_dedup_index()
+                row = dedup_index.find(word)
+                if row is not None:
+                    policy = self.ask_duplicate(word)
+                    if policy is None:
+                        return
+                    old_word, old_meaning = self.words_model.entry(row)
+                    merged = merge_meanings(old_meaning, meaning, policy)
+                    if merged != old_meaning:
+                        update_word_entry(file_name, row, old_word, merged)
+                        self.words_model.row_changed(row, get_words(file_name))
+                    return
+                append_word(file_name, word, meaning)
+                words = get_words(file_name)
+                dedup_index.add(word)
+                self.words_model.row_appended(words)
+                self.words_table.scrollToBottom()
 
     def edit_word(self):
-        if not self.list_combo.currentText() or not self.words_list.currentItem():
+        row = self.current_row()
+        if not self.list_combo.currentText() or row < 0:
             return
-        current_text = self.words_list.currentItem().text()
-        word, meaning = current_text.split(" :: ", 1)
+        word, meaning = self.words_model.entry(row)
         dialog = CustomInputDialog(
             self, self.trans["edit_word_title"],
             [self.trans["add_word_prompt"], self.trans["edit_meaning_prompt"]],
@@ -190,14 +332,14 @@ class WordListManager(QDialog):
         if dialog.exec_():
             new_word, new_meaning = dialog.get_inputs()
             if new_word and new_meaning:
-                words = load_words_from_file(self.list_combo.currentText())
-                index = self.words_list.currentRow()
-                words[index] = (new_word, new_meaning)
-                save_words_to_file(self.list_combo.currentText(), words)
-                self.load_words(self.list_combo.currentText())
+                file_name = self.list_combo.currentText()
+                update_word_entry(file_name, row, new_word, new_meaning)
+                self.get_dedup_index().update(word, new_word, row)
+                self.words_model.row_changed(row, get_words(file_name))
 
     def delete_word(self):
-        if not self.list_combo.currentText() or not self.words_list.currentItem():
+        row = self.current_row()
+        if not self.list_combo.currentText() or row < 0:
             return
         reply = QMessageBox.question(
             self, "Confirm" if self.language == "en" else "تأیید",
@@ -205,11 +347,23 @@ class WordListManager(QDialog):
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            words = load_words_from_file(self.list_combo.currentText())
-            index = self.words_list.currentRow()
-            words.pop(index)
-            save_words_to_file(self.list_combo.currentText(), words)
-            self.load_words(self.list_combo.currentText())
+            file_name = self.list_combo.currentText()
+            self.get_dedup_index().remove(self.words_model.entry(row)[0], row)
+            delete_word_entry(file_name, row)
+            self.parent().entry_deleted(file_name, row)
+            self.words_model.row_removed(row, get_words(file_name))
+
+    def done(self, result):
+        if self.import_task is not None:
+            # Worker processes of a folder import run on after a cancel;
+            # nothing they report may reach this dialog once it is closed
+            self.import_task.cancel()
+            self.import_task.signals.blockSignals(True)
+        if self.loaded_file and self.loaded_file in list_word_files():
+            compact_word_file(self.loaded_file)
+        self.file_catalog.lists_changed.disconnect(self.refresh_lists)
+        self.file_catalog.list_modified.disconnect(self.list_modified)
+        super().done(result)
 
     def new_list(self):
         dialog = CustomInputDialog(
@@ -250,10 +404,7 @@ class WordListManager(QDialog):
                     )
                     return
                 old_file = self.list_combo.currentText()
-                os.rename(
-                    os.path.join("word_lists", old_file),
-                    os.path.join("word_lists", new_file_name)
-                )
+                rename_word_file(old_file, new_file_name)
                 index = self.list_combo.currentIndex()
                 self.list_combo.removeItem(index)
                 self.list_combo.addItem(new_file_name)
@@ -273,9 +424,9 @@ class WordListManager(QDialog):
         )
         if reply == QMessageBox.Yes:
             file_name = self.list_combo.currentText()
-            os.remove(os.path.join("word_lists", file_name))
+            delete_word_file(file_name)
             self.list_combo.removeItem(self.list_combo.currentIndex())
-            self.words_list.clear()
+            self.words_model.set_words([])
             if self.parent().selected_file == file_name:
                 self.parent().selected_file = ""
                 self.parent().update_selected_list_label()
@@ -302,32 +453,156 @@ class WordListManager(QDialog):
                         return
                 file_path, _ = QFileDialog.getOpenFileName(
                     self, self.trans["import_list_title"], "",
-                    "Text Files (*.txt)"
+                    "Word Lists ({})".format(" ".join("*" + ext for ext in supported_extensions()))
                 )
                 if file_path:
-                    words = []
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            for line in f:
-                                line = line.strip()
-                                if line and "::" in line:
-                                    word, meaning = line.split("::", 1)
-                                    word = word.strip()
-                                    meaning = meaning.strip()
-                                    if word and meaning:
-                                        words.append((word, meaning))
-                        if not words:
-                            QMessageBox.warning(
-                                self, "Error" if self.language == "en" else "خطا",
-                                self.trans["import_list_empty"]
-                            )
-                            return
-                        save_words_to_file(file_name, words)
-                        if file_name not in [self.list_combo.itemText(i) for i in range(self.list_combo.count())]:
-                            self.list_combo.addItem(file_name)
-                        self.list_combo.setCurrentText(file_name)
-                    except Exception:
-                        QMessageBox.warning(
-                            self, "Error" if self.language == "en" else "خطا",
-                            self.trans["import_list_invalid"]
-                        )
\ No newline at end of file
+                    policy = self.choose_duplicate_policy()
+                    if policy is not None:
+                        self.start_import(file_path, file_name, name, policy)
+
+    def choose_duplicate_policy(self):
+        items = self.trans["duplicate_policy_options"]
+        dialog = CustomInputDialog(
+            self, self.trans["duplicate_policy_title"],
+            self.trans["duplicate_policy_prompt"], items,
+            current_item=items[DUPLICATE_POLICIES.index(self.parent().duplicate_policy)],
+            dark_mode=self.dark_mode
+        )
+        if not dialog.exec_():
+            return None
+        policy = DUPLICATE_POLICIES[items.index(dialog.get_selected_item())]
+        if policy != self.parent().duplicate_policy:
+            self.parent().duplicate_policy = policy
+            self.parent().save_current_settings()
+        return policy
+
+    def start_import(self, file_path, file_name, name, policy="skip"):
+        task = ListImportTask(file_path, file_name, policy)
+        progress = QProgressDialog(
+            self.trans["import_list_progress"].format(name=name, rejected=0),
+            self.trans["cancel_btn"], 0, 1000, self
+        )
+        progress.setWindowTitle(self.trans["import_list_title"])
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(task.cancel)
+        # Bound methods only: PyQt drops these connections when the dialog
+        # or its progress window is deleted, which a closure would outlive
+        task.signals.progress.connect(progress.setValue)
+        task.signals.rejected.connect(self.import_rejected)
+        task.signals.finished.connect(self.import_finished)
+        task.signals.failed.connect(self.import_failed)
+        self.import_task = task
+        self.import_progress = progress
+        self.import_name = name
+        QThreadPool.globalInstance().start(task)
+
+    def import_rejected(self, rejected):
+        self.import_progress.setLabelText(
+            self.trans["import_list_progress"].format(name=self.import_name, rejected=rejected)
+        )
+
+    def import_finished(self, file_name, count, rejected):
+        self.import_progress.close()
+        self.import_task = None
+        if file_name not in [self.list_combo.itemText(i) for i in range(self.list_combo.count())]:
+            self.list_combo.addItem(file_name)
+        # Written on a worker thread, so the cached copy was not dropped
+        invalidate_word_cache(file_name)
+        if self.list_combo.currentText() == file_name:
+            self.load_words(file_name)
+        else:
+            self.list_combo.setCurrentText(file_name)
+        if rejected:
+            QMessageBox.information(
+                self, self.trans["import_list_title"],
+                self.trans["import_list_done"].format(count=count, rejected=rejected)
+            )
+
+    def import_failed(self, file_name, reason):
+        self.import_progress.close()
+        self.import_task = None
+        if reason == "cancelled":
+            return
+        QMessageBox.warning(
+            self, "Error" if self.language == "en" else "خطا",
+            self.trans["import_list_empty"] if reason == "empty" else self.trans["import_list_invalid"]
+        )
+
+    def import_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, self.trans["import_folder_title"])
+        if not folder:
+            return
+        jobs = folder_import_files(folder)
+        if not jobs:
+            QMessageBox.warning(
+                self, "Error" if self.language == "en" else "خطا",
+                self.trans["import_list_empty"]
+            )
+            return
+        existing = set(list_word_files())
+        clashes = [name for _, name in jobs if name in existing]
+        if clashes:
+            reply = QMessageBox.question(
+                self, "Confirm" if self.language == "en" else "تأیید",
+                self.trans["import_folder_replace"].format(count=len(clashes)),
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                jobs = [(path, name) for path, name in jobs if name not in existing]
+                if not jobs:
+                    return
+        policy = self.choose_duplicate_policy()
+        if policy is None:
+            return
+        task = FolderImportTask(jobs, policy)
+        progress = QProgressDialog(
+            self.trans["import_folder_progress"].format(count=len(jobs)),
+            self.trans["cancel_btn"], 0, 1000, self
+        )
+        progress.setWindowTitle(self.trans["import_folder_title"])
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(task.cancel)
+        task.signals.progress.connect(progress.setValue)
+        task.signals.file_done.connect(self.folder_file_imported)
+        task.signals.finished.connect(self.folder_import_finished)
+        self.import_task = task
+        self.import_progress = progress
+        QThreadPool.globalInstance().start(task)
+
+    def folder_file_imported(self, file_name, count, rejected, error):
+        if error or not file_name:
+            return
+        invalidate_word_cache(file_name)
+        if file_name not in [self.list_combo.itemText(i) for i in range(self.list_combo.count())]:
+            self.list_combo.addItem(file_name)
+        elif self.list_combo.currentText() == file_name:
+            self.load_words(file_name)
+
+    def folder_import_finished(self, imported, failed, cancelled):
+        self.import_progress.close()
+        self.import_task = None
+        QMessageBox.information(
+            self, self.trans["import_folder_title"],
+            self.trans["import_folder_done"].format(imported=imported, failed=failed)
+        )
+
+    def export_list(self):
+        file_name = self.list_combo.currentText()
+        if not file_name:
+            QMessageBox.warning(self, "Error" if self.language == "en" else "خطا",
+                               self.trans["no_list_error"])
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, self.trans["export_list_title"], file_name, "Text Files (*.txt)"
+        )
+        if not path:
+            return
+        try:
+            export_word_list(file_name, path)
+        except OSError:
+            QMessageBox.warning(
+                self, "Error" if self.language == "en" else "خطا",
+                self.trans["export_list_error"]
+            )
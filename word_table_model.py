@@ -0,0 +1,140 @@
+import time
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from search_index import SearchIndex, normalize_query
+
+# Two-column (word, meaning) model over a word list sequence as returned by
+# get_words. Nothing is copied: the view asks only for the rows it paints.
+# While a search is active the model shows only matching rows; the search
+# (and, the first time, building the index) runs a few chunks per event-loop
+# pass so typing never stalls.
+SEARCH_SLICE = 0.008
+
+def _entry(words, row):
+    word, meaning = words[row][:2]
+    return word, meaning
+
+class WordTableModel(QAbstractTableModel):
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.words = []
+        self.search_index = None
+        self.query = ""
+        self.rows = None
+        self.next_chunk = 0
+        self.search_timer = QTimer(self)
+        self.search_timer.setInterval(0)
+        self.search_timer.timeout.connect(self.search_step)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.words) if self.rows is None else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        return self.words[self.source_row(index.row())][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return self.source_row(section) + 1
+
+    def source_row(self, row):
+        # Position in the word list of a row shown by the view
+        return row if self.rows is None else self.rows[row]
+
+    def entry(self, source_row):
+        return _entry(self.words, source_row)
+
+    def set_words(self, words):
+        self.search_timer.stop()
+        self.beginResetModel()
+        self.words = words
+        self.search_index = None
+        self.rows = None
+        self.endResetModel()
+        if self.query:
+            self.set_search(self.query)
+
+    def set_search(self, query):
+        self.search_timer.stop()
+        self.query = normalize_query(query)
+        self.beginResetModel()
+        if self.query:
+            if self.search_index is None:
+                self.search_index = SearchIndex(self.words)
+            self.rows = []
+            self.next_chunk = 0
+        else:
+            self.rows = None
+        self.endResetModel()
+        if self.query:
+            self.search_step()
+
+    def search_step(self):
+        deadline = time.perf_counter() + SEARCH_SLICE
+        found = []
+        while time.perf_counter() < deadline:
+            if self.next_chunk < self.search_index.chunk_count():
+                found += self.search_index.search_chunk(self.query, self.next_chunk)
+                self.next_chunk += 1
+            elif not self.search_index.is_complete():
+                self.search_index.build_chunk()
+            else:
+                break
+        if found:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(found) - 1)
+            self.rows += found
+            self.endInsertRows()
+        if self.next_chunk < self.search_index.chunk_count() or not self.search_index.is_complete():
+            self.search_timer.start()
+        else:
+            self.search_timer.stop()
+
+    def _drop_partial_index(self):
+        # An index still being built is simply started over
+        if self.search_index is not None and not self.search_index.is_complete():
+            self.search_index = None
+
+    def row_appended(self, words):
+        self._drop_partial_index()
+        if self.search_index is not None:
+            self.search_index.append(*_entry(words, len(words) - 1))
+        if self.rows is not None:
+            self.words = words
+            self.set_search(self.query)
+            return
+        row = len(self.words)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.words = words
+        self.endInsertRows()
+
+    def row_changed(self, source_row, words):
+        self._drop_partial_index()
+        if self.search_index is not None:
+            self.search_index.update(source_row, *_entry(words, source_row))
+        self.words = words
+        if self.rows is not None:
+            self.set_search(self.query)
+            return
+        self.dataChanged.emit(self.index(source_row, 0), self.index(source_row, 1))
+
+    def row_removed(self, source_row, words):
+        self._drop_partial_index()
+        if self.search_index is not None:
+            self.search_index.remove(source_row)
+        if self.rows is not None:
+            self.words = words
+            self.set_search(self.query)
+            return
+        self.beginRemoveRows(QModelIndex(), source_row, source_row)
+        self.words = words
+        self.endRemoveRows()